@@ -1,13 +1,33 @@
+import os
+import threading
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_migrate import Migrate  # Import Flask-Migrate
 from .models import db, bcrypt, User  # Import User model
+from .logging_config import configure_logging
 from jinja2 import Environment
-def create_app():
+def create_app(test_config=None):
+    # JSON lines to LOG_FILE via a background listener thread (see logging_config.py)
+    configure_logging()
     app = Flask(__name__)
     app.config["SECRET_KEY"] = "enter your sql lite secret key"
     app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///database.db"
+    app.config["MAX_CONTENT_LENGTH"] = 10 * 1024 * 1024  # reject uploads over 10 MB
+    # Load the embedding model in the background at startup instead of on the first /fetch_jobs
+    app.config["WARM_UP_EMBEDDING_MODEL"] = os.environ.get("WARM_UP_EMBEDDING_MODEL") == "1"
+    # Resume analyses (DeepSeek calls) run on a background pool of this size
+    app.config["MAX_CONCURRENT_ANALYSES"] = int(os.environ.get("MAX_CONCURRENT_ANALYSES", 2))
+    # ...and job searches (Adzuna fetch + filter + ranking) on one of this size
+    app.config["MAX_CONCURRENT_SEARCHES"] = int(os.environ.get("MAX_CONCURRENT_SEARCHES", 2))
+    # Stored job results older than this (seconds) are refreshed in the background
+    app.config["JOB_RESULTS_STALE_AFTER"] = int(os.environ.get("JOB_RESULTS_STALE_AFTER", 6 * 60 * 60))
+    # Add a Server-Timing header (per-stage durations) to every response
+    app.config["SERVER_TIMING"] = os.environ.get("SERVER_TIMING") == "1"
+    # Overrides from the test suite (e.g. an in-memory database)
+    if test_config:
+        app.config.update(test_config)
 
     db.init_app(app)
     bcrypt.init_app(app)
@@ -24,6 +44,21 @@ def create_app():
 
     from .routes import routes_bp
     app.register_blueprint(routes_bp)
+
+    from .tasks import task_queue
+    task_queue.init_app(app)
+
+    from . import metrics
+    metrics.init_app(app)
+
+    @app.cli.command("build-job-index")
+    @click.option("--nlist", type=int, default=None, help="IVF lists (default: sqrt of the corpus size)")
+    def build_job_index(nlist):
+        """Train the IVF centroids used by /fetch_jobs/corpus?mode=ivf."""
+        from .pipeline import job_index
+        job_index.build_ivf(nlist=nlist)
+        click.echo(f"trained over {len(job_index)} jobs")
+
     @app.template_filter('intcomma')
     def intcomma_filter(value):
         try:
@@ -31,6 +66,10 @@ def create_app():
         except (ValueError, TypeError):
             return value
 
+    if app.config["WARM_UP_EMBEDDING_MODEL"]:
+        from .embeddings import warm_up
+        threading.Thread(target=warm_up, name="embedding-warm-up", daemon=True).start()
+
     return app
 
 
@@ -0,0 +1,199 @@
+"""
+Small TTL + LRU result cache with pluggable backends.
+
+- MemoryCache: per-process OrderedDict, fastest, not shared.
+- SQLiteCache: a SQLite file shared by every worker process on the box.
+
+Both are wrapped by ResultCache, which normalizes keys and counts hits
+and misses.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from .sqlite_local import LocalConnection
+
+MISSING = object()  # returned by get() on a miss ([] and {} are valid values)
+
+# SQLiteCache refreshes a row's recency on a hit at most this often (seconds),
+# so hits stay read-only and don't queue up on SQLite's write lock
+SQLITE_TOUCH_INTERVAL = 60
+# ...and checks its size (evicting down to maxsize) once every this many
+# writes per process, rather than on every write
+SQLITE_EVICT_EVERY = 100
+
+
+def make_key(*parts) -> str:
+    """Normalize query parameters into a cache key ("Python Developer" == " python developer")."""
+    normalized = []
+    for part in parts:
+        if part is None:
+            normalized.append("")
+        elif isinstance(part, bool):
+            normalized.append("1" if part else "0")
+        else:
+            normalized.append(" ".join(str(part).split()).lower())
+    return "|".join(normalized)
+
+
+class MemoryCache:
+    def __init__(self, maxsize=1024, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key → (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return MISSING
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    File-backed cache shared across processes. Values are stored as JSON;
+    the least recently read rows are evicted once maxsize is exceeded
+    (recency is tracked to within SQLITE_TOUCH_INTERVAL, and the size is
+    checked every SQLITE_EVICT_EVERY writes, so it may overshoot by that
+    much per process in between).
+    """
+
+    def __init__(self, path, maxsize=10000, ttl=3600, table="cache"):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.table = table
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        self._db = LocalConnection(
+            path,
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)",
+            f"CREATE INDEX IF NOT EXISTS {self.table}_accessed"
+            f" ON {self.table} (accessed_at)",
+        )
+
+    def _conn(self):
+        return self._db.get()
+
+    def get(self, key):
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute(
+            f"SELECT value, expires_at, accessed_at FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return MISSING
+        value, expires_at, accessed_at = row
+        if expires_at < now:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            return MISSING
+        if now - accessed_at >= SQLITE_TOUCH_INTERVAL:
+            conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(value)
+
+    def set(self, key, value):
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at)"
+            " VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + self.ttl, now),
+        )
+        with self._writes_lock:
+            self._writes += 1
+            check = self._writes % SQLITE_EVICT_EVERY == 0
+        if check:
+            self.evict()
+
+    def evict(self):
+        """Drop the least recently read rows beyond maxsize."""
+        conn = self._conn()
+        if len(self) > self.maxsize:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f" SELECT key FROM {self.table} ORDER BY accessed_at DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+
+    def clear(self):
+        self._conn().execute(f"DELETE FROM {self.table}")
+
+    def __len__(self):
+        return self._conn().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class ResultCache:
+    """Counts hits/misses in front of a MemoryCache or SQLiteCache backend."""
+
+    def __init__(self, backend, name="cache"):
+        self.backend = backend
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        value = self.backend.get(key)
+        with self._lock:
+            if value is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.backend.set(key, value)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "backend" : type(self.backend).__name__,
+            "size"    : len(self.backend),
+            "hits"    : hits,
+            "misses"  : misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }
+
+
+def make_cache(name, backend="memory", path=None, maxsize=1024, ttl=3600) -> ResultCache:
+    """Build a ResultCache; backend is "memory" or "sqlite" (path required)."""
+    if backend == "sqlite":
+        store = SQLiteCache(path, maxsize=maxsize, ttl=ttl, table=name)
+    elif backend == "memory":
+        store = MemoryCache(maxsize=maxsize, ttl=ttl)
+    else:
+        raise ValueError(f"Unknown cache backend: {backend}")
+    return ResultCache(store, name=name)
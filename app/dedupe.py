@@ -0,0 +1,117 @@
+"""
+Near-duplicate collapsing for job postings.
+
+The same posting often reaches us under several Adzuna ids (one per
+agency that re-lists it). Each job is reduced to the set of word
+3-shingles of its normalized title + company + description, and two jobs
+are near-duplicates when the Jaccard similarity of those sets is at
+least NEAR_DUPLICATE_THRESHOLD.
+
+Jaccard similarity is estimated with MinHash signatures (MINHASH_PERMUTATIONS
+values per job, computed with numpy), and candidate pairs come from LSH
+banding: signatures are cut into bands, and only jobs sharing an entire
+band are compared. Band sizes are picked so pairs around the threshold
+almost always share a band, keeping a batch (near) linear in its size.
+"""
+import os
+import re
+import zlib
+import numpy as np
+
+# Jaccard similarity (0-1) of shingle sets above which two postings are the same
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", 0.8))
+MINHASH_PERMUTATIONS = 128
+
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+
+_rng = np.random.default_rng(20240601)
+_SEEDS = _rng.integers(0, 2 ** 63, MINHASH_PERMUTATIONS, dtype=np.uint64)
+_MULTIPLIERS = _rng.integers(0, 2 ** 63, MINHASH_PERMUTATIONS, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+
+def fingerprint_text(job: dict) -> str:
+    """Lowercased title + company + description with punctuation removed."""
+    company = (job.get("company") or {}).get("display_name") or ""
+    text = f"{job.get('title') or ''} {company} {job.get('description') or ''}"
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature of the text's word 3-shingles (words, for shorter texts)."""
+    words = text.split()
+    shingles = {" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+    # crc32 rather than hash(): the same jobs must collapse the same way in every worker
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # one multiply-xorshift hash per permutation (uint64 arithmetic wraps around)
+    permuted = (hashes[:, None] ^ _SEEDS) * _MULTIPLIERS
+    return (permuted >> np.uint64(32)).min(axis=0)
+
+
+def lsh_bands(threshold: float, permutations: int = MINHASH_PERMUTATIONS):
+    """
+    (bands, rows) with bands × rows == permutations whose LSH threshold
+    (1/bands)^(1/rows) is the highest one still at or below `threshold`.
+    """
+    best = (permutations, 1)
+    for rows in range(1, permutations + 1):
+        if permutations % rows:
+            continue
+        bands = permutations // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def _has_near_duplicate(signature, keys, buckets, signatures, threshold) -> bool:
+    checked = set()
+    for bucket, key in zip(buckets, keys):
+        for other in bucket.get(key, ()):
+            if other in checked:
+                continue
+            checked.add(other)
+            if np.mean(signatures[other] == signature) >= threshold:
+                return True
+    return False
+
+
+class NearDuplicateIndex:
+    """Incremental collapse_near_duplicates: add() jobs as they arrive, `kept` holds the survivors."""
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self.bands, self.rows = lsh_bands(min(threshold, 1.0))
+        self.kept = []
+        self._buckets = [{} for _ in range(self.bands)]
+        self._signatures = []
+
+    def __len__(self):
+        return len(self.kept)
+
+    def add(self, job: dict) -> bool:
+        """Keep `job` unless it is a near-duplicate of one kept earlier; True if kept."""
+        if self.threshold > 1:
+            self.kept.append(job)
+            return True
+
+        signature = minhash(fingerprint_text(job))
+        rows = self.rows
+        keys = [signature[b * rows:(b + 1) * rows].tobytes() for b in range(self.bands)]
+        if _has_near_duplicate(signature, keys, self._buckets, self._signatures, self.threshold):
+            return False
+
+        for bucket, key in zip(self._buckets, keys):
+            bucket.setdefault(key, []).append(len(self.kept))
+        self.kept.append(job)
+        self._signatures.append(signature)
+        return True
+
+
+def collapse_near_duplicates(jobs: list, threshold: float = NEAR_DUPLICATE_THRESHOLD) -> list:
+    """Keep the first job of every group of near-identical postings, in order."""
+    if threshold > 1 or len(jobs) < 2:
+        return list(jobs)
+
+    index = NearDuplicateIndex(threshold)
+    for job in jobs:
+        index.add(job)
+    return index.kept
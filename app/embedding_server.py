@@ -0,0 +1,380 @@
+"""
+Optional shared embedding server.
+
+Without it every worker process loads its own copy of the model and the
+torch runtime. With EMBEDDING_SERVER_ADDRESS set ("host:port" or a Unix
+socket path) and a shared secret in EMBEDDING_SERVER_AUTHKEY, one server
+process owns the model:
+
+    EMBEDDING_SERVER_AUTHKEY=... python -m app.embedding_server
+
+(listening on instance/embeddings.sock, mode 0600, unless --address is
+given) and workers started with the same settings send their encode
+requests to it (embeddings.encode_texts → remote_encode). Requests
+arriving within MICRO_BATCH_WAIT of each other are encoded as one batch.
+If the server is unreachable, or runs a different EMBEDDING_VERSION,
+workers encode in-process and try the server again after RETRY_AFTER
+seconds.
+
+Wire format (no pickle): every message is a frame, a 4-byte big-endian
+length followed by that many bytes. On connect the server sends a random
+nonce and the client answers with HMAC-SHA256(secret, nonce). Requests
+are JSON ({"op": "encode", "texts": [...]} or {"op": "info"}); the server
+answers with a JSON header frame and, for encode, one more frame holding
+the vectors as raw little-endian float32 (rows × dim from the header).
+"""
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import secrets
+import socket
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+from .embeddings import get_model, encode_texts, EMBEDDING_VERSION, EMBEDDING_BATCH_SIZE
+from .logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_SERVER_ADDRESS = os.environ.get("EMBEDDING_SERVER_ADDRESS") or None
+# Shared secret; there is no default, server and clients refuse to run without one
+EMBEDDING_SERVER_AUTHKEY = os.environ.get("EMBEDDING_SERVER_AUTHKEY", "").encode("utf-8") or None
+DEFAULT_ADDRESS = os.path.join(os.path.dirname(os.path.dirname(__file__)), "instance", "embeddings.sock")
+
+MICRO_BATCH_WAIT = 0.005                 # seconds the batcher waits for more requests
+MICRO_BATCH_TEXTS = EMBEDDING_BATCH_SIZE * 4
+RETRY_AFTER = 30                         # seconds on local encoding after a server failure
+MAX_FRAME_BYTES = 64 * 1024 * 1024       # larger frames are rejected
+HANDSHAKE_TIMEOUT = 10                   # seconds
+# Client (connect, read) timeouts in seconds: an unreachable server fails
+# fast, a slow encode of a large batch doesn't
+CLIENT_TIMEOUTS = (2, 60)
+
+_FRAME = struct.Struct(">I")
+
+
+def parse_address(address):
+    """'host:port' → (host, port) for TCP; anything else is a Unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and "/" not in address:
+        return (host or "127.0.0.1", int(port))
+    return address
+
+
+def rss_mb():
+    """Resident memory of this process in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+# — framing
+
+def _recv_exact(sock, n) -> bytearray:
+    buf = bytearray(n)
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        received = sock.recv_into(view[got:], n - got)
+        if not received:
+            raise EOFError("connection closed")
+        got += received
+    return buf
+
+
+def send_frame(sock, data):
+    sock.sendall(_FRAME.pack(len(data)))
+    sock.sendall(data)
+
+
+def recv_frame(sock, limit=MAX_FRAME_BYTES) -> bytearray:
+    (size,) = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+    if size > limit:
+        raise ValueError(f"frame of {size} bytes exceeds {limit}")
+    return _recv_exact(sock, size)
+
+
+def _send_json(sock, obj):
+    send_frame(sock, json.dumps(obj).encode("utf-8"))
+
+
+def _recv_json(sock):
+    return json.loads(recv_frame(sock))
+
+
+def _signature(authkey, nonce):
+    return hmac.new(authkey, bytes(nonce), hashlib.sha256).digest()
+
+
+class EmbeddingServer:
+    def __init__(self, address=DEFAULT_ADDRESS, authkey=EMBEDDING_SERVER_AUTHKEY):
+        if not authkey:
+            raise ValueError("EMBEDDING_SERVER_AUTHKEY must be set to run the embedding server")
+        self.address = parse_address(address)
+        self.authkey = authkey
+        self.started_at = time.time()
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self.encode_seconds = 0.0
+        self._pending = queue.Queue()
+        self._lock = threading.Lock()
+
+    def _listen(self) -> socket.socket:
+        if isinstance(self.address, tuple):
+            sock = socket.create_server(self.address)
+        else:
+            if os.path.exists(self.address):
+                os.unlink(self.address)  # stale socket from a previous run
+            os.makedirs(os.path.dirname(self.address) or ".", exist_ok=True)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            old_umask = os.umask(0o177)  # created 0600: only this user can connect
+            try:
+                sock.bind(self.address)
+            finally:
+                os.umask(old_umask)
+            os.chmod(self.address, 0o600)
+            sock.listen()
+        return sock
+
+    def serve_forever(self):
+        get_model()
+        threading.Thread(target=self._batch_loop, name="embedding-batcher", daemon=True).start()
+
+        with self._listen() as listener:
+            logger.info("[EmbeddingServer] serving %s on %s", EMBEDDING_VERSION, self.address)
+            while True:
+                conn, _ = listener.accept()
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def _authenticate(self, conn) -> bool:
+        nonce = secrets.token_bytes(32)
+        conn.settimeout(HANDSHAKE_TIMEOUT)
+        try:
+            send_frame(conn, nonce)
+            answer = recv_frame(conn, limit=64)
+        except (EOFError, OSError, ValueError):
+            return False
+        conn.settimeout(None)
+        return hmac.compare_digest(bytes(answer), _signature(self.authkey, nonce))
+
+    def _serve_connection(self, conn):
+        with conn:
+            if not self._authenticate(conn):
+                logger.warning("[EmbeddingServer] rejected unauthenticated connection")
+                return
+            while True:
+                try:
+                    request = _recv_json(conn)
+                except (EOFError, OSError):
+                    return
+                except ValueError as e:  # oversized frame or bad JSON
+                    logger.warning("[EmbeddingServer] dropping connection: %s", e)
+                    return
+
+                op = request.get("op") if isinstance(request, dict) else None
+                if op == "encode":
+                    texts = request.get("texts")
+                    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                        _send_json(conn, {"status": "error", "error": "texts must be a list of strings"})
+                        continue
+                    pending = {"texts": texts, "done": threading.Event()}
+                    self._pending.put(pending)
+                    pending["done"].wait()
+                    status, result = pending["result"]
+                    if status != "ok":
+                        _send_json(conn, {"status": "error", "error": result})
+                        continue
+                    vectors = np.ascontiguousarray(result, dtype="<f4")
+                    rows, dim = vectors.shape if vectors.ndim == 2 else (0, 0)
+                    _send_json(conn, {"status": "ok", "rows": rows, "dim": dim})
+                    send_frame(conn, memoryview(vectors).cast("B"))
+                elif op == "info":
+                    _send_json(conn, {"status": "ok", "info": self.stats()})
+                else:
+                    _send_json(conn, {"status": "error", "error": f"unknown operation {op!r}"})
+
+    def _batch_loop(self):
+        while True:
+            batch = [self._pending.get()]
+            size = len(batch[0]["texts"])
+            deadline = time.monotonic() + MICRO_BATCH_WAIT
+            while size < MICRO_BATCH_TEXTS:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request["texts"])
+
+            started = time.perf_counter()
+            try:
+                vectors = encode_texts([t for r in batch for t in r["texts"]], model=get_model())
+            except Exception as e:
+                logger.error("[EmbeddingServer] encode failed: %s", e)
+                for request in batch:
+                    request["result"] = ("error", str(e))
+                    request["done"].set()
+                continue
+
+            offset = 0
+            for request in batch:
+                n = len(request["texts"])
+                request["result"] = ("ok", vectors[offset:offset + n])
+                request["done"].set()
+                offset += n
+
+            with self._lock:
+                self.requests += len(batch)
+                self.texts += size
+                self.batches += 1
+                self.encode_seconds += time.perf_counter() - started
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "version"      : EMBEDDING_VERSION,
+                "uptime_s"     : round(time.time() - self.started_at, 1),
+                "requests"     : self.requests,
+                "texts"        : self.texts,
+                "batches"      : self.batches,
+                "texts_per_sec": round(self.texts / self.encode_seconds, 1) if self.encode_seconds else 0.0,
+                "rss_mb"       : rss_mb(),
+            }
+
+
+class EmbeddingClient:
+    """One connection per thread to an EmbeddingServer."""
+
+    def __init__(self, address, authkey=EMBEDDING_SERVER_AUTHKEY):
+        if not authkey:
+            raise ValueError("EMBEDDING_SERVER_AUTHKEY must be set to use the embedding server")
+        self.address = parse_address(address)
+        self.authkey = authkey
+        self._local = threading.local()
+        self._down_until = 0.0
+
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def mark_down(self):
+        self._down_until = time.monotonic() + RETRY_AFTER
+
+    def _connect(self):
+        connect_timeout, read_timeout = CLIENT_TIMEOUTS
+        if isinstance(self.address, tuple):
+            conn = socket.create_connection(self.address, timeout=connect_timeout)
+        else:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(connect_timeout)
+            try:
+                conn.connect(self.address)
+            except OSError:
+                conn.close()
+                raise
+        conn.settimeout(read_timeout)
+        try:
+            send_frame(conn, _signature(self.authkey, recv_frame(conn, limit=64)))
+            _send_json(conn, {"op": "info"})
+            info = self._reply(conn)["info"]
+        except Exception:
+            conn.close()
+            raise
+        if info.get("version") != EMBEDDING_VERSION:
+            conn.close()
+            raise RuntimeError(f"server runs {info.get('version')}, worker expects {EMBEDDING_VERSION}")
+        return conn
+
+    @staticmethod
+    def _reply(conn) -> dict:
+        try:
+            reply = _recv_json(conn)
+        except EOFError:
+            raise EOFError("connection closed by the server (wrong EMBEDDING_SERVER_AUTHKEY?)")
+        if reply.get("status") != "ok":
+            raise RuntimeError(reply.get("error"))
+        return reply
+
+    def _call(self, request, with_vectors=False):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        try:
+            _send_json(conn, request)
+            reply = self._reply(conn)
+            if with_vectors:
+                buf = recv_frame(conn)
+                return np.frombuffer(buf, dtype="<f4").reshape(reply["rows"], reply["dim"])
+            return reply
+        except (EOFError, OSError, ValueError):
+            self._local.conn = None
+            conn.close()
+            raise
+
+    def encode(self, texts):
+        return self._call({"op": "encode", "texts": list(texts)}, with_vectors=True)
+
+    def stats(self) -> dict:
+        return self._call({"op": "info"})["info"]
+
+
+_client = EmbeddingClient(EMBEDDING_SERVER_ADDRESS) if EMBEDDING_SERVER_ADDRESS else None
+
+
+def remote_encode(texts):
+    """Vectors from the shared server, or None if it isn't configured or reachable."""
+    if _client is None or not _client.available():
+        return None
+    try:
+        return _client.encode(texts)
+    except Exception as e:
+        logger.warning("[EmbeddingServer] unavailable, encoding in-process for %ss: %s", RETRY_AFTER, e)
+        _client.mark_down()
+        return None
+
+
+def embedding_stats() -> dict:
+    """Where this worker encodes, its RSS, and the server's counters if there is one."""
+    stats = {"mode": "server" if _client else "local", "worker_rss_mb": rss_mb()}
+    if _client is not None:
+        try:
+            stats["server"] = _client.stats()
+        except Exception as e:
+            stats["server"] = {"error": str(e)}
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared embedding server")
+    parser.add_argument("--address", default=EMBEDDING_SERVER_ADDRESS or DEFAULT_ADDRESS,
+                        help="Unix socket path (default instance/embeddings.sock) or host:port")
+    args = parser.parse_args()
+    if not EMBEDDING_SERVER_AUTHKEY:
+        parser.error("set EMBEDDING_SERVER_AUTHKEY to a shared secret (e.g. `python -c 'import secrets; print(secrets.token_hex(32))'`)")
+    configure_logging(log_file=None, console=True)
+    EmbeddingServer(args.address).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
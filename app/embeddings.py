@@ -0,0 +1,237 @@
+"""
+Embedding model provider and persistent store of job-description embeddings.
+
+The SentenceTransformer is loaded lazily on first use (not at import), so
+processes that never rank jobs — `flask db` commands, login-only workers —
+skip the torch import and model load entirely. EMBEDDING_BACKEND selects
+fp32 torch, int8-quantized torch or ONNX Runtime for inference.
+
+Job vectors are keyed by (Adzuna job id, hash of the embedded text, model
+version) and kept as float16 BLOBs in a SQLite file shared by all workers,
+so a job that shows up for hundreds of users is only ever encoded once per
+model version.
+
+encode_texts batches by length: texts are sorted by (estimated) token
+count and grouped so every batch holds about EMBEDDING_BATCH_TOKENS padded
+tokens — many short snippets per batch, few long descriptions — instead of
+padding fixed-size batches to their longest member.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+import numpy as np
+from .sqlite_local import LocalConnection, transaction
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/msmarco-MiniLM-L6-cos-v5"
+
+# Tokens beyond this are truncated; attention cost grows with its square.
+# Unset keeps the model's own limit (512); 256 or 128 trade some ranking
+# quality for speed (see benchmarks/bench_embedding.py)
+EMBEDDING_MAX_SEQ_LENGTH = int(os.environ.get("EMBEDDING_MAX_SEQ_LENGTH") or 0) or None
+# Used for length batching when the model's own limit is unknown
+DEFAULT_MAX_SEQ_LENGTH = 512
+# Upper bounds for one encode batch: texts, and texts × longest text in tokens
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", 64))
+EMBEDDING_BATCH_TOKENS = int(os.environ.get("EMBEDDING_BATCH_TOKENS", 8192))
+
+# Inference backend (all CPU):
+#   "torch"      — fp32 PyTorch (reference)
+#   "torch-int8" — PyTorch with int8 dynamic quantization of the Linear layers
+#   "onnx"       — ONNX Runtime export (needs `pip install sentence-transformers[onnx]`)
+# benchmarks/check_backend_accuracy.py compares a backend's ranking with "torch".
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx")
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "torch")
+
+# Vectors depend on the truncation length and backend too, so a non-default
+# one is part of the key (the defaults keep the plain model name, so vectors
+# stored before these settings existed stay valid)
+EMBEDDING_VERSION = EMBEDDING_MODEL_NAME
+if EMBEDDING_MAX_SEQ_LENGTH:
+    EMBEDDING_VERSION += f"@{EMBEDDING_MAX_SEQ_LENGTH}"
+if EMBEDDING_BACKEND != "torch":
+    EMBEDDING_VERSION += f"/{EMBEDDING_BACKEND}"
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def load_model(backend=EMBEDDING_BACKEND, max_seq_length=EMBEDDING_MAX_SEQ_LENGTH):
+    """Load a new SentenceTransformer on the given backend (see EMBEDDING_BACKENDS)."""
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+
+    started = time.perf_counter()
+    from sentence_transformers import SentenceTransformer
+    if backend == "onnx":
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME, backend="onnx")
+    elif backend == "torch-int8":
+        import torch
+        # dynamic quantization runs on CPU only
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    else:
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    if max_seq_length:
+        model.max_seq_length = max_seq_length
+    logger.info("[Embeddings] loaded %s (%s) in %.2fs", EMBEDDING_MODEL_NAME, backend, time.perf_counter() - started)
+    return model
+
+
+def get_model():
+    """Return the shared SentenceTransformer, loading it on first call (thread-safe)."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = load_model()
+    return _model
+
+
+def warm_up():
+    """Load the model (or connect to the embedding server) so the first real request doesn't pay for it."""
+    encode_texts(["warm-up"])
+
+
+def _estimated_tokens(text: str) -> int:
+    """Cheap token count estimate (~4 characters per word piece, plus [CLS]/[SEP])."""
+    return len(text) // 4 + 2
+
+
+def length_batches(texts, max_seq_length=None, batch_size=None, batch_tokens=None) -> list:
+    """
+    Group text indices into batches of similar length, shortest first.
+    A batch grows until it has batch_size texts or batch_tokens padded
+    tokens (texts × its longest text, capped at max_seq_length).
+    """
+    max_seq_length = max_seq_length or EMBEDDING_MAX_SEQ_LENGTH or DEFAULT_MAX_SEQ_LENGTH
+    batch_size = batch_size or EMBEDDING_BATCH_SIZE
+    batch_tokens = batch_tokens or EMBEDDING_BATCH_TOKENS
+
+    lengths = [min(_estimated_tokens(t), max_seq_length) for t in texts]
+    order = sorted(range(len(texts)), key=lengths.__getitem__)
+
+    batches, current = [], []
+    for i in order:
+        # sorted ascending, so text i is the longest in the batch so far
+        if current and (len(current) >= batch_size or (len(current) + 1) * lengths[i] > batch_tokens):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def encode_texts(texts, model=None, batch_size=None, batch_tokens=None) -> np.ndarray:
+    """
+    Normalized float32 embeddings of `texts`, in order, encoded in
+    length-sorted batches. Without an explicit model, the shared embedding
+    server is used when configured (see embedding_server.py).
+    """
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    if model is None:
+        from .embedding_server import remote_encode
+        vectors = remote_encode(texts)
+        if vectors is not None:
+            return vectors
+        model = get_model()
+    out = None
+    for batch in length_batches(texts, model.max_seq_length, batch_size, batch_tokens):
+        encoded = model.encode(
+            [texts[i] for i in batch],
+            batch_size=len(batch),
+            convert_to_tensor=False,
+            normalize_embeddings=True
+        )
+        if out is None:
+            out = np.zeros((len(texts), encoded.shape[1]), dtype=np.float32)
+        out[batch] = encoded
+    return out
+
+
+def text_hash(text: str) -> str:
+    """Content hash of the text that was embedded (detects edited descriptions)."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmbeddingStore:
+    def __init__(self, path, model_name, dtype=np.float16):
+        self.path = path
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.hits = 0
+        self.misses = 0
+        self._db = LocalConnection(
+            path,
+            "CREATE TABLE IF NOT EXISTS job_embeddings ("
+            " job_id TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (job_id, text_hash, model))",
+        )
+        self._lock = threading.Lock()
+
+    def _conn(self):
+        return self._db.get()
+
+    def get_many(self, keys) -> dict:
+        """
+        keys: iterable of (job_id, text_hash). Returns {key: float32 vector}
+        for the keys that are stored; missing keys are simply absent.
+        """
+        wanted = set(keys)
+        found = {}
+        job_ids = list({job_id for job_id, _ in wanted})
+        conn = self._conn()
+
+        # stay well under SQLite's bound-parameter limit
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                "SELECT job_id, text_hash, vector FROM job_embeddings"
+                f" WHERE model = ? AND job_id IN ({placeholders})",
+                (self.model_name, *chunk),
+            )
+            for job_id, digest, blob in rows:
+                key = (job_id, digest)
+                if key in wanted:
+                    found[key] = np.frombuffer(blob, dtype=self.dtype).astype(np.float32)
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(wanted) - len(found)
+        return found
+
+    def put_many(self, items):
+        """items: iterable of ((job_id, text_hash), vector)."""
+        rows = [
+            (job_id, digest, self.model_name,
+             np.asarray(vector, dtype=self.dtype).tobytes())
+            for (job_id, digest), vector in items
+        ]
+        if not rows:
+            return
+        conn = self._conn()
+        with transaction(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO job_embeddings (job_id, text_hash, model, vector)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits"    : hits,
+            "misses"  : misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+        }
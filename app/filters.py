@@ -0,0 +1,232 @@
+"""
+Experience and seniority filter engine for fetched jobs.
+
+Every pattern is compiled once at import. classify_job looks at a job's
+description and title in a single pass (one lowercase, one scan per
+pattern) and returns a JobClass; filter_jobs applies the candidate's
+experience to a whole batch.
+
+Large batches (PARALLEL_THRESHOLD jobs and up) are sharded across a
+long-lived process pool; only the description/title strings are sent to
+the workers. Smaller batches stay serial, where the pool's IPC overhead
+would cost more than it saves.
+"""
+import logging
+import math
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+PARALLEL_THRESHOLD = 1500                   # jobs; below this classify serially
+PARALLEL_WORKERS   = min(4, os.cpu_count() or 1)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Regex pattern to match various experience formats
+_EXPERIENCE_PATTERN = re.compile(r"""
+    # 1) Dash or en-dash ranges: "2-5 years" or "three-five yrs"
+    (?:(?P<min1>\d+)|(?P<min1_word>one|two|three|four|five|six|seven|eight|nine|ten))\s*[–-]\s*(?:(?P<max1>\d+)|(?P<max1_word>one|two|three|four|five|six|seven|eight|nine|ten))\s*(?:years?|yrs?)\b
+  | # 2) "to" ranges: "2 to 5 years" or "three to five yrs"
+    (?:(?P<min2>\d+)|(?P<min2_word>one|two|three|four|five|six|seven|eight|nine|ten))\s+to\s+(?:(?P<max2>\d+)|(?P<max2_word>one|two|three|four|five|six|seven|eight|nine|ten))\s*(?:years?|yrs?)\b
+  | # 3) Plus notation: "3+ years" or "three plus yrs"
+    (?:(?P<min3>\d+)|(?P<min3_word>one|two|three|four|five|six|seven|eight|nine|ten))\s*(?:\+|plus)\s*(?:years?|yrs?)\b
+  | # 4) "at least" / "minimum": "at least 4 years" or "minimum three yrs"
+    (?:at\s*least|atleast|minimum)\b.*?(?:(?P<min4>\d+)|(?P<min4_word>one|two|three|four|five|six|seven|eight|nine|ten))\s*(?:years?|yrs?)\b
+  | # 5) Fallback single number: "5 years" or "five yrs"
+    (?:(?P<min5>\d+)|(?P<min5_word>one|two|three|four|five|six|seven|eight|nine|ten))\s*(?:years?|yrs?)\b
+""", re.IGNORECASE | re.VERBOSE)
+
+# The same pattern for text that is already lowercased: case-insensitive
+# matching is several times slower in `re`, and every alternative is ASCII.
+_EXPERIENCE_PATTERN_LOWER = re.compile(_EXPERIENCE_PATTERN.pattern, re.VERBOSE)
+
+# Mapping of number words to their numeric values
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10
+}
+
+def _word_to_number(word: Optional[str]) -> float:
+    """Convert a number word to its numeric value (e.g., 'three' -> 3.0)."""
+    if not word:
+        return 0.0
+    return float(_NUMBER_WORDS.get(word.lower(), 0))
+
+def extract_required_experience(text: str) -> float:
+    """
+    Extract the minimum required experience in years from a job description snippet.
+    Supports patterns like:
+      - "3+ years", "2-5 yrs", "five years", "at least three years"
+    Returns the lowest bound as a float.
+    If nothing matches, uses fallback logic to check for fresher-friendly phrases or presence of 'experience'.
+    """
+    return _classify_text(text)[0]
+
+
+# Keywords that imply no experience is required
+_NO_EXP_KEYWORDS = [
+    "no experience", "fresher", "entry level", "training provided",
+    "on the job training", "gain experience", "will be trained", "learn"
+]
+_NO_EXP_PATTERN = re.compile("|".join(re.escape(k) for k in _NO_EXP_KEYWORDS))
+
+# Title keywords for the seniority bands (matched as whole words)
+SENIOR_KEYWORDS = ["senior", "sr", "lead", "manager", "principal", "architect", "head", "director", "vp", "executive"]
+JUNIOR_KEYWORDS = ["junior", "jr", "intern", "fresher", "graduate", "entry-level", "entry level", "associate"]
+
+_SENIORITY_PATTERN = re.compile(
+    r"\b(?:(?P<senior>" + "|".join(SENIOR_KEYWORDS) + r")|(?P<junior>" + "|".join(JUNIOR_KEYWORDS) + r"))\b",
+    re.IGNORECASE,
+)
+
+_MIN_GROUPS = [(f"min{i}", f"min{i}_word") for i in range(1, 6)]
+
+
+class JobClass(NamedTuple):
+    required_years: float     # lowest bound of the experience asked for
+    fresher_friendly: bool    # description mentions a no-experience phrase
+    vague_experience: bool    # "experience" mentioned but no usable number (→ 1.0)
+    senior_title: bool
+    junior_title: bool
+
+    @property
+    def seniority(self) -> str:
+        if self.senior_title and not self.junior_title:
+            return "senior"
+        if self.junior_title and not self.senior_title:
+            return "junior"
+        return "mid"
+
+
+def _classify_text(text: str):
+    """Return (required_years, fresher_friendly, mentions_experience) for a description."""
+    if not text:
+        return 0.0, False, False
+
+    text_lower = text.lower()
+    fresher = _NO_EXP_PATTERN.search(text_lower) is not None
+    mentions = "experience" in text_lower
+
+    # Every alternative ends in "year(s)"/"yr(s)", so skip the regex without one
+    match = None
+    if "yr" in text_lower or "year" in text_lower:
+        match = _EXPERIENCE_PATTERN_LOWER.search(text_lower)
+    if match:
+        for number_group, word_group in _MIN_GROUPS:
+            if match.group(number_group):
+                return float(match.group(number_group)), fresher, mentions
+            word_value = _word_to_number(match.group(word_group))
+            if word_value > 0:
+                return word_value, fresher, mentions
+
+    if fresher:
+        return 0.0, fresher, mentions
+
+    # If "experience" is mentioned in any form, assume minimal requirement (1 year)
+    if "exp" in text_lower:
+        return 1.0, fresher, mentions
+
+    return 0.0, fresher, mentions
+
+
+def _classify_pair(desc: str, title: str) -> JobClass:
+    required, fresher, mentions = _classify_text(desc)
+
+    senior = junior = False
+    for match in _SENIORITY_PATTERN.finditer(title):
+        if match.group("senior"):
+            senior = True
+        else:
+            junior = True
+
+    return JobClass(
+        required_years=required,
+        fresher_friendly=fresher,
+        vague_experience=mentions and required == 1.0,
+        senior_title=senior,
+        junior_title=junior,
+    )
+
+
+def _job_texts(job: dict):
+    return job.get("description", "") or job.get("snippet", ""), job.get("title") or ""
+
+
+def _classify_chunk(pairs: list) -> list:
+    return [_classify_pair(desc, title) for desc, title in pairs]
+
+
+def classify_job(job: dict) -> JobClass:
+    return _classify_pair(*_job_texts(job))
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the web process has live threads (task pools, HTTP pool)
+            _pool = ProcessPoolExecutor(
+                max_workers=PARALLEL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _classify_parallel(jobs: list) -> list:
+    global _pool
+    pairs = [_job_texts(job) for job in jobs]
+    size = math.ceil(len(pairs) / (PARALLEL_WORKERS * 2))
+    chunks = [pairs[i:i + size] for i in range(0, len(pairs), size)]
+    try:
+        results = []
+        for chunk_result in _get_pool().map(_classify_chunk, chunks):
+            results.extend(chunk_result)
+        return results
+    except Exception as e:
+        # e.g. BrokenProcessPool after a worker was killed; drop it and go serial
+        logger.error("[Filters] process pool failed, classifying serially: %s", e)
+        with _pool_lock:
+            _pool = None
+        return _classify_chunk(pairs)
+
+
+def classify_jobs(jobs: list, parallel: Optional[bool] = None) -> list:
+    """
+    Classify a batch of jobs. parallel=None decides automatically (pool for
+    PARALLEL_THRESHOLD+ jobs when more than one worker is available).
+    """
+    if parallel is None:
+        parallel = len(jobs) >= PARALLEL_THRESHOLD and PARALLEL_WORKERS > 1
+    if parallel and jobs:
+        return _classify_parallel(jobs)
+    return [classify_job(job) for job in jobs]
+
+
+def is_eligible(job_class: JobClass, candidate_exp: float) -> bool:
+    """Does a job of this class suit a candidate with candidate_exp years?"""
+    # 🔍 Skip if vague "experience" mentioned with no extractable value
+    if job_class.vague_experience:
+        return False
+    if candidate_exp < job_class.required_years:
+        return False
+
+    # Remove roles not matching candidate experience level
+    if candidate_exp < 3:
+        return not job_class.senior_title
+    if candidate_exp >= 4:
+        return not job_class.junior_title
+    return True  # Mid-level
+
+
+def filter_jobs(jobs: list, candidate_exp: float, parallel: Optional[bool] = None) -> list:
+    """Keep the jobs whose experience requirement and title suit the candidate."""
+    return [
+        job for job, job_class in zip(jobs, classify_jobs(jobs, parallel=parallel))
+        if is_eligible(job_class, candidate_exp)
+    ]
@@ -0,0 +1,109 @@
+"""
+Shared HTTP client layer for the external APIs (Adzuna, DeepSeek).
+
+Every integration gets one process-wide requests.Session, so connections
+are pooled and kept alive across pages, retries and requests instead of
+opening a new TCP+TLS connection per call. connection_stats() (served
+under "http" by /cache_stats) shows how many requests reused a connection.
+"""
+import atexit
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+# — pool limits (per client)
+POOL_CONNECTIONS = 4     # number of per-host pools kept alive
+POOL_MAXSIZE     = 16    # max open connections per host
+POOL_BLOCK       = True  # wait for a free connection instead of exceeding POOL_MAXSIZE
+
+# — (connect, read) timeouts in seconds
+TIMEOUTS = {
+    "adzuna"  : (5, 20),
+    "deepseek": (5, 30),
+}
+DEFAULT_TIMEOUT = (5, 30)
+
+_sessions = {}
+_request_counts = {}
+_lock = threading.Lock()
+
+
+def get_session(client: str) -> requests.Session:
+    """Return the shared session for `client`, creating it on first use."""
+    session = _sessions.get(client)
+    if session is not None:
+        return session
+
+    with _lock:
+        session = _sessions.get(client)
+        if session is None:
+            adapter = HTTPAdapter(
+                pool_connections=POOL_CONNECTIONS,
+                pool_maxsize=POOL_MAXSIZE,
+                pool_block=POOL_BLOCK,
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[client] = session
+            _request_counts[client] = 0
+    return session
+
+
+def request(client: str, method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request through the client's pooled session with its default timeout."""
+    session = get_session(client)
+    kwargs.setdefault("timeout", TIMEOUTS.get(client, DEFAULT_TIMEOUT))
+    with _lock:
+        _request_counts[client] += 1
+    return session.request(method, url, **kwargs)
+
+
+def get(client: str, url: str, **kwargs) -> requests.Response:
+    return request(client, "GET", url, **kwargs)
+
+
+def post(client: str, url: str, **kwargs) -> requests.Response:
+    return request(client, "POST", url, **kwargs)
+
+
+def connection_stats() -> dict:
+    """
+    Per-client counters: requests sent and connections opened so far
+    (the difference is how many requests reused a kept-alive connection).
+    """
+    stats = {}
+    with _lock:
+        clients = list(_sessions.items())
+        counts = dict(_request_counts)
+
+    for client, session in clients:
+        opened = 0
+        seen = set()
+        for adapter in session.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                opened += pool.num_connections
+        stats[client] = {
+            "requests"   : counts.get(client, 0),
+            "connections": opened,
+        }
+    return stats
+
+
+def close_all():
+    """Close every pooled connection (e.g. before forking workers)."""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _request_counts.clear()
+
+
+atexit.register(close_all)
@@ -0,0 +1,58 @@
+"""
+Persistent store of Adzuna job payloads keyed by job id.
+
+Ranked results are saved as (job id, score) pairs only (see
+pipeline.save_job_results); the full payloads they point to live here,
+zlib-compressed, in a SQLite file shared by all workers.
+"""
+import json
+import time
+import zlib
+from .sqlite_local import LocalConnection, transaction
+
+
+class JobStore:
+    def __init__(self, path):
+        self.path = path
+        self._db = LocalConnection(
+            path,
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " job_id TEXT PRIMARY KEY,"
+            " payload BLOB NOT NULL,"
+            " stored_at REAL NOT NULL)",
+        )
+
+    def _conn(self):
+        return self._db.get()
+
+    def put_many(self, jobs):
+        """Store (or refresh) job dicts; jobs without an id are skipped."""
+        now = time.time()
+        rows = [
+            (str(job["id"]), zlib.compress(json.dumps(job).encode("utf-8")), now)
+            for job in jobs if job.get("id")
+        ]
+        if not rows:
+            return
+        conn = self._conn()
+        with transaction(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO jobs (job_id, payload, stored_at) VALUES (?, ?, ?)",
+                rows,
+            )
+
+    def get_many(self, job_ids) -> dict:
+        """Return {job_id: job dict} for the ids that are stored."""
+        job_ids = [str(job_id) for job_id in job_ids]
+        found = {}
+        conn = self._conn()
+        for start in range(0, len(job_ids), 500):
+            chunk = job_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT job_id, payload FROM jobs WHERE job_id IN ({placeholders})",
+                chunk,
+            )
+            for job_id, payload in rows:
+                found[job_id] = json.loads(zlib.decompress(payload))
+        return found
@@ -0,0 +1,167 @@
+"""
+Rate-limit-aware scheduling of API keys (Adzuna, DeepSeek).
+
+Each KeyPool hands its keys out to concurrent callers instead of walking
+them in order, so throughput grows with the number of keys:
+
+    key_no = pool.acquire()            # None: every key is cooling down
+    try:
+        res = http_client.get(..., params=_params(pool.keys[key_no]))
+    finally:
+        pool.release(key_no, res)      # res None → transport error
+
+acquire() picks the key with the fewest requests in flight (or plain
+round robin), skipping keys that are cooling down. release() reads the
+response: 429 cools the key down for Retry-After seconds (or a jittered
+exponential backoff when the header is missing), 5xx, transport errors and
+other 4xx back off the same way, 401/402/403 (bad key, unpaid or exhausted
+quota) park the key for KEY_REJECTED_COOLDOWN, and anything else resets
+its backoff. When
+every key is cooling down, acquire() waits for the first one to come back,
+up to KEY_POOL_MAX_WAIT.
+"""
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+from .metrics import registry
+
+KEY_POOL_STRATEGY = os.environ.get("KEY_POOL_STRATEGY", "least_loaded")  # or "round_robin"
+KEY_POOL_MAX_WAIT = float(os.environ.get("KEY_POOL_MAX_WAIT", 30))       # seconds acquire() may block
+KEY_BACKOFF_BASE = 1.0           # seconds, doubled per consecutive failure
+KEY_BACKOFF_MAX = 60.0
+KEY_REJECTED_COOLDOWN = 15 * 60  # seconds a key answering 401/402/403 is left alone
+KEY_REJECTED_STATUSES = (401, 402, 403)
+
+KEY_COOLDOWNS = registry.counter("api_key_cooldowns_total", "API keys put on cooldown, by pool and reason")
+
+
+def backoff_delay(failures, base=KEY_BACKOFF_BASE, cap=KEY_BACKOFF_MAX):
+    """Exponential backoff with jitter: uniform in [half, full] of min(cap, base * 2^(failures-1))."""
+    delay = min(cap, base * 2 ** max(0, failures - 1))
+    return random.uniform(delay / 2, delay)
+
+
+def retry_after_seconds(response):
+    """The Retry-After header in seconds (delta or HTTP date), or None."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _KeyState:
+    __slots__ = ("in_flight", "requests", "failures", "cooldown_until", "cooldowns")
+
+    def __init__(self):
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0          # consecutive
+        self.cooldown_until = 0.0  # time.monotonic()
+        self.cooldowns = 0
+
+
+class KeyPool:
+    def __init__(self, name, keys, strategy=KEY_POOL_STRATEGY, max_wait=KEY_POOL_MAX_WAIT):
+        if strategy not in ("least_loaded", "round_robin"):
+            raise ValueError(f"unknown key pool strategy {strategy!r}")
+        self.name = name
+        self.keys = list(keys)
+        self.strategy = strategy
+        self.max_wait = max_wait
+        self._state = [_KeyState() for _ in self.keys]
+        self._next = 0
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _pick(self, now, exclude):
+        ready = [
+            i for i in range(len(self.keys))
+            if self._state[i].cooldown_until <= now and i not in exclude
+        ]
+        if not ready:
+            return None
+        # rotate so ties (and round_robin) start after the last key handed out
+        ready.sort(key=lambda i: (i - self._next) % len(self.keys))
+        if self.strategy == "least_loaded":
+            return min(ready, key=lambda i: self._state[i].in_flight)
+        return ready[0]
+
+    def acquire(self, exclude=(), max_wait=None):
+        """
+        Index of the key to use next, or None if no key (outside `exclude`)
+        comes off cooldown within max_wait seconds.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        deadline = time.monotonic() + max_wait
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                i = self._pick(now, exclude)
+                if i is not None:
+                    state = self._state[i]
+                    state.in_flight += 1
+                    state.requests += 1
+                    self._next = i + 1
+                    return i
+
+                waiting = [
+                    s.cooldown_until for j, s in enumerate(self._state) if j not in exclude
+                ]
+                if not waiting or min(waiting) > deadline:
+                    return None
+                self._cond.wait(min(waiting) - now)
+
+    def release(self, i, response=None):
+        """Return key i, updating its state from the response (None: no response at all)."""
+        status = response.status_code if response is not None else None
+        with self._cond:
+            state = self._state[i]
+            state.in_flight -= 1
+
+            reason = None
+            if status in KEY_REJECTED_STATUSES:
+                state.failures += 1
+                reason, delay = "rejected", KEY_REJECTED_COOLDOWN
+            elif status is None or status >= 400:
+                state.failures += 1
+                reason = "rate_limited" if status == 429 else "error"
+                delay = retry_after_seconds(response) if status == 429 else None
+                if delay is None:
+                    delay = backoff_delay(state.failures)
+            else:
+                state.failures = 0
+
+            if reason:
+                state.cooldown_until = time.monotonic() + delay
+                state.cooldowns += 1
+                KEY_COOLDOWNS.inc(pool=self.name, reason=reason)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._cond:
+            return {
+                "strategy": self.strategy,
+                "keys": [
+                    {
+                        "key"        : i,
+                        "in_flight"  : s.in_flight,
+                        "requests"   : s.requests,
+                        "cooldowns"  : s.cooldowns,
+                        "cooldown_s" : round(max(0.0, s.cooldown_until - now), 1),
+                    }
+                    for i, s in enumerate(self._state)
+                ],
+            }
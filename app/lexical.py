@@ -0,0 +1,96 @@
+"""
+Lexical side of hybrid ranking: BM25 over job texts plus explicit skill
+matches against the skills DeepSeek extracted from the resume.
+
+LexicalScorer builds one sparse term-count matrix per batch of jobs
+(scikit-learn's CountVectorizer), stored column-wise so each term's
+column is its postings list. BM25 and skill lookups then only touch the
+columns of the query's terms, which is cheap enough to rank every
+fetched job and embed just the best slice (see pipeline.run_job_search).
+"""
+import numpy as np
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Share of the lexical score that comes from skill matches; the rest is BM25
+SKILL_SHARE = 0.5
+
+# Keeps "c++", "c#" and "f#" as tokens
+_TOKEN_PATTERN = r"(?u)\b\w[\w+#]*"
+
+
+def parse_skills(skills: str) -> list:
+    """'Python, Django , C++, python' → ['python', 'django', 'c++']"""
+    seen = []
+    for skill in (skills or "").split(","):
+        skill = " ".join(skill.split()).lower()
+        if skill and skill not in seen:
+            seen.append(skill)
+    return seen
+
+
+class LexicalScorer:
+    def __init__(self, texts):
+        # imported here, not at module level: scikit-learn adds ~1.5s to create_app
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        self.n = len(texts)
+        self.vectorizer = CountVectorizer(token_pattern=_TOKEN_PATTERN, dtype=np.float32)
+        self.analyzer = self.vectorizer.build_analyzer()
+        try:
+            self.tf = self.vectorizer.fit_transform(texts).tocsc()
+        except ValueError:  # no tokens at all (empty batch or empty texts)
+            self.tf = None
+            return
+        self.vocab = self.vectorizer.vocabulary_
+
+        doc_len = np.asarray(self.tf.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() or 1.0
+        self.length_norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len)
+        df = np.diff(self.tf.indptr)
+        self.idf = np.log(1 + (self.n - df + 0.5) / (df + 0.5))
+
+    def _postings(self, col):
+        start, end = self.tf.indptr[col], self.tf.indptr[col + 1]
+        return self.tf.indices[start:end], self.tf.data[start:end]
+
+    def bm25(self, query: str) -> np.ndarray:
+        """BM25 score of every job for the (deduplicated) terms of `query`."""
+        scores = np.zeros(self.n, dtype=np.float32)
+        if self.tf is None:
+            return scores
+        for col in {self.vocab[t] for t in self.analyzer(query) if t in self.vocab}:
+            rows, freq = self._postings(col)
+            scores[rows] += self.idf[col] * freq * (BM25_K1 + 1) / (freq + self.length_norm[rows])
+        return scores
+
+    def skill_matches(self, skills: str) -> np.ndarray:
+        """Fraction of the resume's skills mentioned in each job (all tokens of a skill present)."""
+        skills = parse_skills(skills)
+        matches = np.zeros(self.n, dtype=np.float32)
+        if self.tf is None or not skills:
+            return matches
+        for skill in skills:
+            cols = [self.vocab.get(t) for t in self.analyzer(skill)]
+            if not cols or None in cols:
+                continue
+            rows = self._postings(cols[0])[0]
+            for col in cols[1:]:
+                rows = np.intersect1d(rows, self._postings(col)[0], assume_unique=True)
+            matches[rows] += 1
+        return matches / len(skills)
+
+    def score(self, skills: str, resume_text: str) -> np.ndarray:
+        """Lexical score in [0, 1]: skill match fraction blended with max-normalized BM25."""
+        bm25 = self.bm25(resume_text)
+        top = bm25.max() if self.n else 0.0
+        if top > 0:
+            bm25 /= top
+        return SKILL_SHARE * self.skill_matches(skills) + (1 - SKILL_SHARE) * bm25
+
+    def top(self, scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k best lexical scores, in original job order."""
+        if k >= self.n:
+            return np.arange(self.n)
+        return np.sort(np.argpartition(-scores, k - 1)[:k])
@@ -0,0 +1,134 @@
+"""
+Application logging, configured once by create_app (configure_logging).
+
+Request and task threads only put log records on an in-memory queue
+(LazyQueueHandler); a QueueListener thread formats them as JSON lines
+and writes them to LOG_FILE, so a slow disk or console never blocks a
+request. Records are queued unformatted: message arguments are only
+rendered by the listener, and not at all for disabled levels, so use
+lazy %-style arguments on hot paths:
+
+    logger.info("page %s: %s results", page, len(results))
+
+Large payloads go through log_payload, which samples them and caps their
+size instead of dumping whole API responses on every call.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.environ.get("LOG_FILE", "app.log")
+LOG_TO_CONSOLE = os.environ.get("LOG_TO_CONSOLE", "1") == "1"
+
+# Longest message (characters) written for a single record
+LOG_MAX_MESSAGE_CHARS = int(os.environ.get("LOG_MAX_MESSAGE_CHARS", 4000))
+# Share of log_payload calls that are written, and their size cap
+LOG_PAYLOAD_SAMPLE_RATE = float(os.environ.get("LOG_PAYLOAD_SAMPLE_RATE", 0.01))
+LOG_PAYLOAD_MAX_CHARS = int(os.environ.get("LOG_PAYLOAD_MAX_CHARS", 2000))
+
+_listener = None
+
+
+def _truncate(text, limit):
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}… [{len(text) - limit} more chars]"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, thread, msg (size-capped), exc."""
+
+    def format(self, record):
+        entry = {
+            "ts"    : self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level" : record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg"   : _truncate(record.getMessage(), LOG_MAX_MESSAGE_CHARS),
+        }
+        if record.exc_text or record.exc_info:
+            entry["exc"] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue records as they are. The stock QueueHandler formats every
+    message in the calling thread (for queues that pickle); ours stays
+    in-process, so formatting is left to the listener thread.
+    """
+
+    def prepare(self, record):
+        if record.exc_info and not record.exc_text:
+            # tracebacks reference live frames; render them before they change
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+
+class _Payload:
+    """Serialized and truncated only if the record is actually written."""
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def __str__(self):
+        try:
+            text = json.dumps(self.payload, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            text = repr(self.payload)
+        return _truncate(text, LOG_PAYLOAD_MAX_CHARS)
+
+
+def log_payload(logger, label, payload, level=logging.DEBUG, sample_rate=None):
+    """Log a (sampled, size-capped) payload such as an API response."""
+    rate = LOG_PAYLOAD_SAMPLE_RATE if sample_rate is None else sample_rate
+    if not logger.isEnabledFor(level) or random.random() >= rate:
+        return
+    logger.log(level, "%s: %s", label, _Payload(payload))
+
+
+def configure_logging(level=LOG_LEVEL, log_file=LOG_FILE, console=LOG_TO_CONSOLE):
+    """Route all logging through one queue and listener thread. Safe to call repeatedly."""
+    global _listener
+    if _listener is not None:
+        return
+
+    handlers = []
+    formatter = JsonFormatter()
+    if log_file:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=20 * 1024 * 1024, backupCount=5, encoding="utf-8"
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(LazyQueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Write out queued records and stop the listener thread."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
@@ -0,0 +1,182 @@
+"""
+Lightweight in-process instrumentation: counters and histograms, served
+in the Prometheus text format by the /metrics route.
+
+    with timer("adzuna_fetch"):          # or @timed("rank") on a function
+        ...
+    ADZUNA_REQUESTS.inc(status="200")
+
+Every timer observes stage_duration_seconds{stage=...}. Inside a web
+request it is also recorded for the Server-Timing response header, sent
+when the SERVER_TIMING app setting is on. init_app times every request
+into http_request_duration_seconds.
+
+Metrics are per process: with several workers, scrape each one (or
+aggregate on the Prometheus side).
+"""
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        f'{k}="{v.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), " ")}"'
+        for k, v in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help=""):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def lines(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(key)} {value}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help="", buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label key → [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def lines(self):
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            for bound, count in zip(self.buckets, values):
+                yield f"{self.name}_bucket{_format_labels(key, [('le', repr(bound))])} {count}"
+            yield f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {values[-1]}"
+            yield f"{self.name}_sum{_format_labels(key)} {values[-2]:.6f}"
+            yield f"{self.name}_count{_format_labels(key)} {values[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, *args):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, *args)
+            return self._metrics[name]
+
+    def counter(self, name, help="") -> Counter:
+        return self._get(Counter, name, help)
+
+    def histogram(self, name, help="", buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        out = []
+        for metric in metrics:
+            out.append(f"# HELP {metric.name} {metric.help}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(metric.lines())
+        return "\n".join(out) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram("stage_duration_seconds", "Time spent in each instrumented stage")
+REQUEST_SECONDS = registry.histogram("http_request_duration_seconds", "Web request latency")
+
+
+def _record_server_timing(stage, seconds):
+    from flask import g, has_request_context
+    if has_request_context():
+        timings = g.setdefault("server_timing", {})
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timer(stage, **labels):
+    """Time the block into stage_duration_seconds (and Server-Timing, inside a request)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage, **labels)
+        _record_server_timing(stage, elapsed)
+
+
+def timed(stage):
+    """Decorator form of timer()."""
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def init_app(app):
+    """Time every request; add a Server-Timing header when SERVER_TIMING is on."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        started = g.get("request_started")
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        REQUEST_SECONDS.observe(
+            elapsed,
+            endpoint=request.endpoint or "unknown",
+            method=request.method,
+            status=str(response.status_code),
+        )
+        if app.config.get("SERVER_TIMING"):
+            timings = [f"{stage};dur={s * 1000:.1f}" for stage, s in g.get("server_timing", {}).items()]
+            timings.append(f"total;dur={elapsed * 1000:.1f}")
+            response.headers["Server-Timing"] = ", ".join(timings)
+        return response
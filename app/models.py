@@ -2,6 +2,7 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_login import UserMixin
 import json
+import numpy as np
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
@@ -36,6 +37,18 @@ class ResumeAnalysis(db.Model):
     experience_years = db.Column(db.Float, nullable=False, default=0.0)
     suggested_roles = db.Column(db.Text, nullable=False, default="[]")
     timestamp = db.Column(db.DateTime, server_default=db.func.now())
+    resume_embedding = db.Column(db.LargeBinary)  # float32 vector, computed at upload
+    embedding_model = db.Column(db.String(200))   # model that produced resume_embedding
+
+    def get_resume_embedding(self, model_name):
+        """Stored resume vector, or None if missing or from a different model."""
+        if not self.resume_embedding or self.embedding_model != model_name:
+            return None
+        return np.frombuffer(self.resume_embedding, dtype=np.float32)
+
+    def set_resume_embedding(self, vector, model_name):
+        self.resume_embedding = np.asarray(vector, dtype=np.float32).tobytes()
+        self.embedding_model = model_name
 
     def to_dict(self):
         return {
@@ -55,3 +68,29 @@ class UserPreference(db.Model):
     timestamp = db.Column(db.DateTime, default=db.func.current_timestamp())
 
     user = db.relationship('User', backref=db.backref('preference', uselist=False))
+
+
+class BackgroundTask(db.Model):
+    __tablename__ = "background_task"
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending | running | done | failed
+    payload = db.Column(db.Text, nullable=False, default="{}")
+    error = db.Column(db.Text)
+    progress = db.Column(db.Text)  # JSON, updated by the task while it runs
+    result = db.Column(db.Text)    # JSON, set when the task is done
+    created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    owner = db.Column(db.String(100))    # worker running the task (tasks.WORKER_ID)
+    heartbeat_at = db.Column(db.DateTime)  # refreshed by the owner while running
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "error": self.error,
+            "progress": json.loads(self.progress) if self.progress else {},
+        }
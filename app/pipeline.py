@@ -0,0 +1,325 @@
+"""
+The resume → jobs search pipeline: fetch, de-duplicate, filter, rank.
+
+run_job_search is executed by the "job_search" background task (see
+tasks.py) and reports each stage through a progress callback, so the web
+request that starts a search returns immediately. Its ranked output is
+persisted in UserPreference.job_results (save_job_results) and served
+from there on later visits (load_job_results).
+
+Every ranked search also feeds job_index (see vector_index.py), so
+rank_from_corpus can rank a resume against earlier searches' jobs
+without calling Adzuna. Only each search's lexical shortlist is indexed
+(the jobs it embedded anyway), so the corpus leans towards the skills and
+experience levels of the users who searched before.
+"""
+import json
+import logging
+import os
+import time
+from typing import Optional
+
+from .models import db
+from .job_store import JobStore
+from .vector_index import JobIndex
+from .filters import filter_jobs
+from .lexical import LexicalScorer
+from .dedupe import NearDuplicateIndex
+from .metrics import timer
+from .embeddings import text_hash
+from .utils import (
+    fetch_jobs_for_roles, rank_job_indices, embed_job_texts, job_text,
+    embed_resume, build_resume_text, EMBEDDING_VERSION, INSTANCE_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+TOP_N_RESULTS = 100  # jobs rendered on jobs_raw.html
+
+# Only this many valid jobs, best by lexical score, are embedded and ranked
+LEXICAL_PREFILTER_TOP = int(os.environ.get("LEXICAL_PREFILTER_TOP", 600))
+
+# Adzuna results requested per suggested role...
+MAX_RESULTS_PER_ROLE = 1000
+# ...but fetching stops once this many distinct postings (after both
+# de-duplication steps) have passed the experience/seniority filter;
+# 0 fetches everything. Leaves the lexical shortlist room to choose.
+FETCH_TARGET_CANDIDATES = int(os.environ.get("FETCH_TARGET_CANDIDATES", 3 * LEXICAL_PREFILTER_TOP))
+
+# Full payloads of ranked jobs; job_results only holds (id, score) pairs
+job_store = JobStore(os.path.join(INSTANCE_DIR, "jobs.db"))
+
+# Vectors of every search's shortlist (see index_jobs), for rank_from_corpus
+job_index = JobIndex(os.path.join(INSTANCE_DIR, "job_index.db"))
+
+# rank_from_corpus pulls this many times k from the index before the
+# experience filter, which drops some of them
+CORPUS_OVERFETCH = 5
+
+
+def _no_progress(**info):
+    pass
+
+
+def run_job_search(analysis, preferences, progress=_no_progress) -> dict:
+    """
+    Run the whole search for one user and return
+      { jobs: top TOP_N_RESULTS ranked job dicts, valid_count: jobs left after filtering,
+        query: the preferences searched with }
+
+    progress(**info) is called as the pipeline moves through its stages
+    (stage = "fetching" | "filtering" | "ranking") with running counts.
+    """
+    candidate_exp = analysis.experience_years or 0.0
+    roles = json.loads(analysis.suggested_roles)
+    country = preferences.country
+    city = preferences.city
+    remote = preferences.is_remote
+
+    # 1) Fetch raw jobs from Adzuna (all roles and pages concurrently)
+    progress(stage="fetching", pages=0, fetched=0)
+
+    def on_page(pages_done, jobs_fetched):
+        progress(stage="fetching", pages=pages_done, fetched=jobs_fetched)
+
+    #    Each window of pages is de-duplicated as it lands (steps 2a/2b),
+    #    and fetching stops once FETCH_TARGET_CANDIDATES distinct postings
+    #    have passed the filter (step 3)
+    seen_ids = set()
+    distinct = NearDuplicateIndex()
+    passed = []       # distinct.kept[:filtered[0]] that passed the filter
+    filtered = [0]
+
+    def filter_pending():
+        pending = distinct.kept[filtered[0]:]
+        filtered[0] = len(distinct.kept)
+        with timer("filter"):
+            passed.extend(filter_jobs(pending, candidate_exp))
+
+    def enough(window_jobs):
+        with timer("dedupe"):
+            for job in window_jobs:
+                job_id = job.get("id")
+                if job_id and job_id not in seen_ids:
+                    seen_ids.add(job_id)
+                    distinct.add(job)
+        if not FETCH_TARGET_CANDIDATES:
+            return False
+        # Filter only once the target is within reach even if every job
+        # not yet filtered passes, so the filter sees few, large batches
+        # (large ones go to its process pool)
+        if len(passed) + len(distinct) - filtered[0] < FETCH_TARGET_CANDIDATES:
+            return False
+        filter_pending()
+        return len(passed) >= FETCH_TARGET_CANDIDATES
+
+    raw_jobs = fetch_jobs_for_roles(
+        roles=roles,
+        country=country,
+        city=city if city else None,
+        is_remote=remote,
+        max_results=MAX_RESULTS_PER_ROLE,
+        on_page=on_page,
+        enough=enough
+    )
+
+    # 2a) De-duplicate by job["id"]...
+    # 2b) ...and collapse near-identical postings listed under different ids
+    #     (the same job re-posted by several agencies, see dedupe.py).
+    #     Both ran window by window above; put the survivors back in
+    #     fetch order (role by role, page by page).
+    position = {}
+    for i, job in enumerate(raw_jobs):
+        position.setdefault(job.get("id"), i)
+
+    def in_fetch_order(jobs):
+        return sorted(
+            (job for job in jobs if job["id"] in position),
+            key=lambda job: position[job["id"]]
+        )
+
+    deduped = in_fetch_order(distinct.kept)
+    progress(
+        stage="filtering", fetched=len(raw_jobs), unique=len(deduped),
+        near_duplicates=len(seen_ids) - len(distinct)
+    )
+
+    # 3) Filter out listings requiring more experience than the candidate
+    #    has, and titles outside their seniority band (see filters.py).
+    #    Jobs filtered while fetching are not classified again; the rest go
+    #    as one batch
+    filter_pending()
+    valid_jobs = in_fetch_order(passed)
+    progress(stage="ranking", filtered=len(deduped) - len(valid_jobs), valid=len(valid_jobs))
+
+    # 4) Lexical pre-filter: BM25 + skill matches over every valid job,
+    #    so only the best LEXICAL_PREFILTER_TOP go through the embedding model
+    resume_projects = json.loads(analysis.projects)
+    resume_experience = json.loads(analysis.experience)
+    resume_text = build_resume_text(analysis.skills, resume_projects, resume_experience)
+
+    with timer("lexical"):
+        scorer = LexicalScorer([
+            f"{job.get('title') or ''}\n{job.get('description') or ''}" for job in valid_jobs
+        ])
+        lexical = scorer.score(analysis.skills, resume_text)
+        shortlist = scorer.top(lexical, LEXICAL_PREFILTER_TOP)
+    candidates = [valid_jobs[i] for i in shortlist]
+    candidate_texts = [job_text(job) for job in candidates]
+    candidate_vectors = embed_job_texts(candidates, candidate_texts)
+
+    # 5) Hybrid ranking: embedding similarity blended with the lexical score
+    #    (resume vector is stored at upload)
+    ranked = rank_job_indices(
+        resume_skills=analysis.skills,
+        resume_projects=resume_projects,
+        resume_experience=resume_experience,
+        jobs=candidates,
+        top_k=TOP_N_RESULTS,
+        resume_embedding=_resume_embedding(analysis),
+        lexical_scores=lexical[shortlist],
+        job_embeddings=candidate_vectors
+    )
+
+    # 6) Top 100, already sorted by match score; only these are copied
+    top_jobs = [{**candidates[i], "match_score": score} for i, score in ranked]
+    logger.info(
+        "[Pipeline] %s fetched, %s unique ids, %s after near-duplicates, %s valid, %s embedded, %s returned",
+        len(raw_jobs), len(seen_ids), len(deduped), len(valid_jobs), len(candidates), len(top_jobs)
+    )
+
+    # 7) Add the embedded jobs to the shared corpus index
+    with timer("index"):
+        index_jobs(candidates, candidate_texts, candidate_vectors, country, remote)
+
+    return {
+        "jobs"       : top_jobs,
+        "valid_count": len(valid_jobs),
+        "query"      : _query_of(country, city, remote),
+    }
+
+
+def _resume_embedding(analysis):
+    """The stored resume vector; missing or produced by another model → re-encode and store it."""
+    resume_emb = analysis.get_resume_embedding(EMBEDDING_VERSION)
+    if resume_emb is None:
+        resume_emb = embed_resume(
+            analysis.skills, json.loads(analysis.projects), json.loads(analysis.experience)
+        )
+        analysis.set_resume_embedding(resume_emb, EMBEDDING_VERSION)
+        db.session.commit()
+    return resume_emb
+
+
+def index_jobs(jobs, texts, vectors, country, remote):
+    """
+    Store payloads and vectors of `jobs` in the corpus. `texts` and
+    `vectors` are the job texts and embeddings used for ranking; IVF
+    retraining is left to the "build_job_index" task (see tasks.py).
+    """
+    if not jobs:
+        return
+    job_store.put_many(jobs)
+    added = job_index.add(jobs, vectors, [text_hash(t) for t in texts], country, remote)
+    logger.info("[Pipeline] indexed %s new job(s), corpus size %s", added, len(job_index))
+
+
+def rank_from_corpus(analysis, preferences, k=TOP_N_RESULTS, mode="flat") -> list:
+    """
+    Rank the resume against every indexed job matching the user's
+    preferences (country, city unless remote, remote only if asked for),
+    apply the experience filter and return the top k job dicts with
+    match_score. mode is "flat" (exact) or "ivf" (see vector_index.py).
+    The index holds the lexical shortlists of earlier searches, not every
+    job they fetched (see index_jobs).
+    """
+    remote = bool(preferences.is_remote)
+    hits = job_index.search(
+        _resume_embedding(analysis),
+        k=k * CORPUS_OVERFETCH,
+        country=preferences.country,
+        city=None if remote else preferences.city,
+        remote=True if remote else None,
+        mode=mode,
+    )
+
+    payloads = job_store.get_many(job_id for job_id, _ in hits)
+    jobs = []
+    for job_id, score in hits:
+        job = payloads.get(job_id)
+        if job is not None:
+            job["match_score"] = score
+            jobs.append(job)
+
+    return filter_jobs(jobs, analysis.experience_years or 0.0)[:k]
+
+
+def _query_of(country, city, remote):
+    return [country, city or None, bool(remote)]
+
+
+def analysis_key(analysis) -> str:
+    """
+    Content hash of a ResumeAnalysis. Stored results are tied to this, not
+    to analysis.id: a re-analysed resume replaces the row, and SQLite
+    usually hands the new row the same id.
+    """
+    content = json.dumps([
+        analysis.skills, analysis.projects, analysis.experience,
+        analysis.experience_years, analysis.suggested_roles,
+    ])
+    return text_hash(content)
+
+
+def save_job_results(preferences, analysis, result):
+    """
+    Persist a run_job_search result compactly: payloads go to job_store,
+    UserPreference.job_results keeps ids, scores and a freshness timestamp.
+    """
+    jobs = []
+    for job in result["jobs"]:
+        job = dict(job)
+        job.pop("match_score", None)
+        jobs.append(job)
+    job_store.put_many(jobs)
+
+    preferences.job_results = json.dumps({
+        "generated_at": time.time(),
+        "analysis_key": analysis_key(analysis),
+        "query"       : result["query"],
+        "valid_count" : result["valid_count"],
+        "jobs"        : [
+            [str(job["id"]), round(job["match_score"], 6)] for job in result["jobs"]
+        ],
+    })
+
+
+def load_job_results(preferences, analysis) -> Optional[dict]:
+    """
+    Stored results for this analysis + preferences, as
+      { jobs: job dicts with match_score, valid_count, generated_at }
+    or None if there are none, they were ranked for another analysis or
+    other preferences, or a job payload has gone missing from job_store.
+    """
+    if not preferences.job_results:
+        return None
+
+    stored = json.loads(preferences.job_results)
+    query = _query_of(preferences.country, preferences.city, preferences.is_remote)
+    if stored.get("analysis_key") != analysis_key(analysis) or stored.get("query") != query:
+        return None
+
+    payloads = job_store.get_many(job_id for job_id, _ in stored["jobs"])
+    jobs = []
+    for job_id, score in stored["jobs"]:
+        job = payloads.get(job_id)
+        if job is None:
+            return None
+        job["match_score"] = score
+        jobs.append(job)
+
+    return {
+        "jobs"        : jobs,
+        "valid_count" : stored["valid_count"],
+        "generated_at": stored["generated_at"],
+    }
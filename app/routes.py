@@ -2,11 +2,10 @@ import os
 import time
 import logging
 import json
-import re
 
 from flask import (
     Blueprint, render_template, request,
-    redirect, url_for, flash, current_app
+    redirect, url_for, flash, current_app, jsonify, Response
 )
 from flask_login import (
     login_user, login_required,
@@ -17,88 +16,16 @@ from .models import (
     User,
     ResumeAnalysis,
     UserPreference,
+    BackgroundTask,
 )
-from .utils import process_resume_file, fetch_jobs_from_adzuna, rank_jobs_by_similarity
-import re
-
-import re
-from typing import Optional
-
-# Pre-compile the pattern (VERBOSE mode for readability)
-import re
-from typing import Optional
-
-# Regex pattern to match various experience formats
-_EXPERIENCE_PATTERN = re.compile(r"""
-    # 1) Dash or en-dash ranges: "2-5 years" or "three-five yrs"
-    (?:(?P<min1>\d+)|(?P<min1_word>one|two|three|four|five|six|seven|eight|nine|ten))\s*[–-]\s*(?:(?P<max1>\d+)|(?P<max1_word>one|two|three|four|five|six|seven|eight|nine|ten))\s*(?:years?|yrs?)\b
-  | # 2) "to" ranges: "2 to 5 years" or "three to five yrs"
-    (?:(?P<min2>\d+)|(?P<min2_word>one|two|three|four|five|six|seven|eight|nine|ten))\s+to\s+(?:(?P<max2>\d+)|(?P<max2_word>one|two|three|four|five|six|seven|eight|nine|ten))\s*(?:years?|yrs?)\b
-  | # 3) Plus notation: "3+ years" or "three plus yrs"
-    (?:(?P<min3>\d+)|(?P<min3_word>one|two|three|four|five|six|seven|eight|nine|ten))\s*(?:\+|plus)\s*(?:years?|yrs?)\b
-  | # 4) "at least" / "minimum": "at least 4 years" or "minimum three yrs"
-    (?:at\s*least|atleast|minimum)\b.*?(?:(?P<min4>\d+)|(?P<min4_word>one|two|three|four|five|six|seven|eight|nine|ten))\s*(?:years?|yrs?)\b
-  | # 5) Fallback single number: "5 years" or "five yrs"
-    (?:(?P<min5>\d+)|(?P<min5_word>one|two|three|four|five|six|seven|eight|nine|ten))\s*(?:years?|yrs?)\b
-""", re.IGNORECASE | re.VERBOSE)
-
-# Mapping of number words to their numeric values
-_NUMBER_WORDS = {
-    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
-    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10
-}
-
-def _word_to_number(word: Optional[str]) -> float:
-    """Convert a number word to its numeric value (e.g., 'three' -> 3.0)."""
-    if not word:
-        return 0.0
-    return float(_NUMBER_WORDS.get(word.lower(), 0))
-
-def extract_required_experience(text: str) -> float:
-    """
-    Extract the minimum required experience in years from a job description snippet.
-    Supports patterns like:
-      - "3+ years", "2-5 yrs", "five years", "at least three years"
-    Returns the lowest bound as a float.
-    If nothing matches, uses fallback logic to check for fresher-friendly phrases or presence of 'experience'.
-    """
-    if not text:
-        return 0.0
-
-    match = _EXPERIENCE_PATTERN.search(text)
-    if match:
-        for group_prefix in ['min1', 'min2', 'min3', 'min4', 'min5']:
-            if match.group(group_prefix):
-                return float(match.group(group_prefix))
-            word_value = _word_to_number(match.group(f"{group_prefix}_word"))
-            if word_value > 0:
-                return word_value
-
-    # Lowercase the text for easier keyword matching
-    text_lower = text.lower()
-
-    # Keywords that imply no experience is required
-    no_exp_keywords = [
-        "no experience", "fresher", "entry level", "training provided",
-        "on the job training", "gain experience", "will be trained", "learn"
-    ]
-
-    if any(phrase in text_lower for phrase in no_exp_keywords):
-        return 0.0
-
-    # If "experience" is mentioned in any form, assume minimal requirement (1 year)
-    if "experience" in text_lower or 'exp' in text_lower:
-        return 1.0
-
-    return 0.0
-
-
-# — Configure file‐based logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    filename="app.log"
-)
+from .tasks import task_queue, latest_task
+from .utils import adzuna_cache, resume_cache_stats, adzuna_key_pool, deepseek_key_pool
+from .pipeline import load_job_results, rank_from_corpus
+from .embedding_server import embedding_stats
+from .http_client import connection_stats
+from .metrics import registry, timer
+
+
 logger = logging.getLogger(__name__)
 
 routes_bp = Blueprint("routes", __name__)
@@ -166,9 +93,13 @@ def dashboard():
         user_id=current_user.id
     ).first()
 
+    task = latest_task(current_user.id, "resume_analysis")
+    pending_task = task if task and task.status in ("pending", "running") else None
+
     return render_template(
         "dashboard.html",
-        details=analysis.to_dict() if analysis else None
+        details=analysis.to_dict() if analysis else None,
+        pending_task=pending_task
     )
 
 
@@ -183,31 +114,29 @@ def upload_resume():
     # Save PDF locally
     filename = f"{int(time.time())}_{current_user.id}.pdf"
     path     = os.path.join(UPLOAD_FOLDER, filename)
-    f.save(path)
+    with timer("save_upload"):
+        f.save(path)
 
-    # Analyze via DeepSeek
-    result = process_resume_file(path)
+    # Analyze via DeepSeek in the background; the dashboard polls for completion
+    with timer("enqueue"):
+        current_user.resume_filename = filename
+        db.session.commit()
+        task_queue.submit(
+            current_user.id, "resume_analysis",
+            {"path": path, "filename": filename}
+        )
 
-    # Remove old analysis & store new
-    ResumeAnalysis.query.filter_by(
-        user_id=current_user.id
-    ).delete()
-
-    ra = ResumeAnalysis(
-        user_id=current_user.id,
-        skills=json.dumps(result["skills"]),
-        projects=json.dumps(result["projects"]),
-        experience=json.dumps(result["experience"]),
-        experience_years=result["experience_years"],
-        suggested_roles=json.dumps(result["roles"])
-    )
+    flash("Resume uploaded! Analysis is running and will appear here shortly.", "success")
+    return redirect(url_for("routes.dashboard"))
 
-    current_user.resume_filename = filename
-    db.session.add(ra)
-    db.session.commit()
 
-    flash("Resume uploaded and analyzed successfully!", "success")
-    return redirect(url_for("routes.dashboard"))
+@routes_bp.route("/tasks/<int:task_id>", methods=["GET"])
+@login_required
+def task_status(task_id):
+    task = BackgroundTask.query.filter_by(
+        id=task_id, user_id=current_user.id
+    ).first_or_404()
+    return jsonify(task.to_dict())
 
 
 @routes_bp.route("/delete_resume", methods=["POST"])
@@ -233,6 +162,10 @@ def delete_resume():
             user_id=current_user.id
         ).delete()
 
+        BackgroundTask.query.filter_by(
+            user_id=current_user.id, kind="resume_analysis", status="pending"
+        ).delete()
+
         current_user.resume_filename = ""
         db.session.commit()
 
@@ -241,6 +174,24 @@ def delete_resume():
     return redirect(url_for("routes.dashboard"))
 
 
+@routes_bp.route("/cache_stats", methods=["GET"])
+@login_required
+def cache_stats():
+    return jsonify({
+        "adzuna": adzuna_cache.stats(),
+        "resume_analyses": resume_cache_stats(),
+        "embeddings": embedding_stats(),
+        "api_keys": {"adzuna": adzuna_key_pool.stats(), "deepseek": deepseek_key_pool.stats()},
+        "http": connection_stats(),
+    })
+
+
+@routes_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus scrape endpoint (this worker's counters and histograms)."""
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+
 @routes_bp.route("/logout")
 @login_required
 def logout():
@@ -295,9 +246,13 @@ def submit_preferences():
     pref.is_remote = is_remote
     pref.country   = country
     pref.city      = city
+    pref.job_results = None  # ranked for the old preferences
 
     db.session.add(pref)
     db.session.commit()
+
+    # New preferences → start a fresh search; /fetch_jobs shows its progress
+    task_queue.submit(current_user.id, "job_search")
     '''exp_years = analysis.experience_years or 0.0
     if exp_years < 4:
         # If less than 4, block the job‐search flow
@@ -322,91 +277,57 @@ def fetch_jobs():
         flash("Missing analysis or preferences.", "error")
         return redirect(url_for("routes.dashboard"))
 
-    candidate_exp = analysis.experience_years or 0.0
-    roles = json.loads(analysis.suggested_roles)
-    country = preferences.country
-    city = preferences.city
-    remote = preferences.is_remote
-
-    # 2) Fetch raw jobs from Adzuna (all jobs)
-    raw_jobs = []
-    for role in roles:
-        raw_jobs.extend(
-            fetch_jobs_from_adzuna(
-                role=role,
-                country=country,
-                city=city if city else None,
-                is_remote=remote,
-                max_results=1000
-            )
-        )
+    task = latest_task(current_user.id, "job_search")
+    searching = task is not None and task.status in ("pending", "running")
 
-    # 3) De-duplicate by job["id"]
-    unique = {}
-    for job in raw_jobs:
-        job_id = job.get("id")
-        if job_id and job_id not in unique:
-            unique[job_id] = job
-    deduped = list(unique.values())
-
-    # 4) Filter out listings requiring more experience
-    valid_jobs = []
-    for job in deduped:
-        desc = job.get("description", "") or job.get("snippet", "")
-        desc_lower = desc.lower()
-        req_exp = extract_required_experience(desc)
-
-        # 🔍 Skip if vague "experience" mentioned with no extractable value
-        if "experience" in desc_lower and req_exp == 1.0:
-            continue
-
-        if candidate_exp >= req_exp:
-            valid_jobs.append(job)
-
-    # 4.5) Remove roles not matching candidate experience level
-    senior_keywords = ["senior", "sr", "lead", "manager", "principal", "architect", "head", "director", "vp", "executive"]
-    junior_keywords = ["junior", "jr", "intern", "fresher", "graduate", "entry-level", "entry level", "associate"]
-
-    senior_pattern = re.compile(r'\b(' + '|'.join(senior_keywords) + r')\b', re.IGNORECASE)
-    junior_pattern = re.compile(r'\b(' + '|'.join(junior_keywords) + r')\b', re.IGNORECASE)
-
-    filtered_jobs = []
-    for job in valid_jobs:
-        title = job.get("title") or ""
-        title_lower = title.lower()
-
-        if candidate_exp < 3:
-            if not senior_pattern.search(title_lower):
-                filtered_jobs.append(job)
-        elif candidate_exp >= 4:
-            if not junior_pattern.search(title_lower):
-                filtered_jobs.append(job)
-        else:
-            filtered_jobs.append(job)  # Mid-level
-
-    valid_jobs = filtered_jobs
-
-    # 5) Apply ML ranking algorithm
-    ranked_jobs = rank_jobs_by_similarity(
-        resume_skills=analysis.skills,
-        resume_projects=json.loads(analysis.projects),
-        resume_experience=json.loads(analysis.experience),
-        jobs=valid_jobs,
-        top_k=len(valid_jobs)
-    )
+    # 2) Serve stored results; refresh them in the background once stale
+    with timer("load_results"):
+        results = load_job_results(preferences, analysis)
+    if results is not None:
+        age = time.time() - results["generated_at"]
+        if age > current_app.config["JOB_RESULTS_STALE_AFTER"] and not searching:
+            task_queue.submit(current_user.id, "job_search")
+
+        flash(f"{results['valid_count']} valid jobs found after filtering by experience.", "info")
+        with timer("render"):
+            return render_template("jobs_raw.html", jobs=results["jobs"], searching=False)
+
+    # 3) Nothing stored yet: the search runs as a background task (see pipeline.py)
+    if task is not None and task.status == "failed":
+        flash("Job search failed, please try again.", "error")
+        return redirect(url_for("routes.get_jobs"))
 
-    # 6) Sort by match score
-    ranked_sorted = sorted(ranked_jobs, key=lambda job: job['match_score'], reverse=True)
+    if not searching:
+        task_queue.submit(current_user.id, "job_search")
 
-    # 7) Top 100
-    top_100_jobs = ranked_sorted[:100]
+    return render_template("jobs_raw.html", jobs=[], searching=True)
 
-    # 8) Flash message
-    flash(f"{len(valid_jobs)} valid jobs found after filtering by experience.", "info")
 
-    # 9) Render page
-    return render_template("jobs_raw.html", jobs=top_100_jobs)
+@routes_bp.route("/fetch_jobs/corpus", methods=["GET"])
+@login_required
+def fetch_jobs_from_corpus():
+    """
+    Rank against the jobs indexed by earlier searches (no Adzuna calls);
+    ?mode=ivf for the approximate index. Only each search's lexical
+    shortlist is indexed, not every job it fetched (see pipeline.index_jobs).
+    """
+    analysis = ResumeAnalysis.query.filter_by(user_id=current_user.id).first()
+    preferences = UserPreference.query.filter_by(user_id=current_user.id).first()
 
+    if not analysis or not preferences:
+        flash("Missing analysis or preferences.", "error")
+        return redirect(url_for("routes.dashboard"))
 
+    mode = "ivf" if request.args.get("mode") == "ivf" else "flat"
+    jobs = rank_from_corpus(analysis, preferences, mode=mode)
+    flash(f"{len(jobs)} jobs matched from listings shortlisted by earlier searches.", "info")
+    return render_template("jobs_raw.html", jobs=jobs, searching=False)
 
 
+@routes_bp.route("/job_search_status", methods=["GET"])
+@login_required
+def job_search_status():
+    task = latest_task(current_user.id, "job_search")
+    if task is None:
+        return jsonify({"status": "none"}), 404
+    return jsonify(task.to_dict())
@@ -0,0 +1,50 @@
+"""
+Per-thread SQLite connections for the file-backed stores (result cache,
+job embeddings, job payloads, vector index).
+
+Every store file is opened in WAL mode, so readers in any worker process
+never block on a writer, with autocommit (isolation_level=None): plain
+statements commit on their own and multi-row writes go through
+transaction().
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class LocalConnection:
+    """A SQLite file opened once per thread; `schema` statements run on each new connection."""
+
+    def __init__(self, path, *schema):
+        self.path = path
+        self.schema = schema
+        self._local = threading.local()
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            for statement in self.schema:
+                conn.execute(statement)
+            self._local.conn = conn
+        return conn
+
+
+@contextmanager
+def transaction(conn):
+    """
+    BEGIN … COMMIT around the block, rolled back if it raises — otherwise
+    the thread's connection would stay inside the failed transaction and
+    every later BEGIN on it would fail.
+    """
+    conn.execute("BEGIN")
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
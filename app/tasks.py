@@ -0,0 +1,297 @@
+"""
+In-process background task queue.
+
+Tasks are rows in the `background_task` table, so their state survives a
+worker restart. Each task kind runs on its own ThreadPoolExecutor, sized
+by the MAX_CONCURRENT_* app settings, inside an app context.
+
+A task is claimed with a conditional UPDATE that records the claiming
+worker (WORKER_ID), so when several workers see the same pending row only
+one of them runs it. While a worker runs tasks it refreshes their
+heartbeat_at every TASK_HEARTBEAT_INTERVAL seconds; on the same tick it
+puts running tasks whose heartbeat is older than TASK_LEASE (their worker
+died or was restarted) back to pending, and picks up pending tasks it
+hasn't queued yet.
+
+The queue starts (start()) when the process serves its first request —
+not in create_app, so CLI commands (`flask db upgrade`), the reloader's
+watcher process and filter pool workers never run tasks.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from .models import db, BackgroundTask
+
+logger = logging.getLogger(__name__)
+
+# A "running" task whose heartbeat is older than this belongs to a dead worker
+TASK_LEASE = timedelta(minutes=2)
+# Seconds between heartbeats (and checks for expired leases and pending tasks)
+TASK_HEARTBEAT_INTERVAL = 30
+
+# Identifies this process in BackgroundTask.owner
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_handlers = {}
+
+
+def task_handler(kind):
+    """Register fn(task, payload) as the handler for tasks of `kind`."""
+    def register(fn):
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+class TaskQueue:
+    def __init__(self):
+        self.app = None
+        self.pool_sizes = {}
+        self._executors = {}
+        self._queued = set()   # task ids submitted to an executor here, not yet started
+        self._lock = threading.Lock()
+        self._started = False
+
+    def init_app(self, app):
+        self.app = app
+        self.pool_sizes = {
+            "resume_analysis": app.config["MAX_CONCURRENT_ANALYSES"],
+            "job_search"     : app.config["MAX_CONCURRENT_SEARCHES"],
+        }
+        app.extensions["task_queue"] = self
+        app.before_request(self.start)
+
+    def start(self):
+        """Pick up unfinished tasks and start the heartbeat; only the first call does anything."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self._requeue_unfinished()
+        threading.Thread(target=self._heartbeat_loop, name="task-heartbeat", daemon=True).start()
+
+    def _executor(self, kind) -> ThreadPoolExecutor:
+        if kind not in self._executors:
+            self._executors[kind] = ThreadPoolExecutor(
+                max_workers=self.pool_sizes.get(kind, 1),
+                thread_name_prefix=f"task-{kind}",
+            )
+        return self._executors[kind]
+
+    def _enqueue(self, task_id, kind):
+        with self._lock:
+            if task_id in self._queued:
+                return False
+            self._queued.add(task_id)
+        self._executor(kind).submit(self._run, task_id)
+        return True
+
+    def submit(self, user_id, kind, payload=None) -> BackgroundTask:
+        task = BackgroundTask(
+            user_id=user_id,
+            kind=kind,
+            status="pending",
+            payload=json.dumps(payload or {}),
+        )
+        db.session.add(task)
+        db.session.commit()
+        self._enqueue(task.id, kind)
+        logger.info("[Tasks] queued %s task %s for user %s", kind, task.id, user_id)
+        return task
+
+    def _heartbeat_loop(self):
+        while True:
+            time.sleep(TASK_HEARTBEAT_INTERVAL)
+            try:
+                self._heartbeat()
+                self._requeue_unfinished()
+            except Exception as e:
+                logger.error("[Tasks] heartbeat failed: %s", e)
+
+    def _heartbeat(self):
+        with self.app.app_context():
+            BackgroundTask.query.filter_by(owner=WORKER_ID, status="running").update(
+                {"heartbeat_at": datetime.utcnow()}, synchronize_session=False
+            )
+            db.session.commit()
+
+    def _requeue_unfinished(self):
+        with self.app.app_context():
+            try:
+                expired = datetime.utcnow() - TASK_LEASE
+                reset = BackgroundTask.query.filter(
+                    BackgroundTask.status == "running",
+                    func.coalesce(BackgroundTask.heartbeat_at, BackgroundTask.started_at) < expired,
+                ).update({"status": "pending", "owner": None}, synchronize_session=False)
+                db.session.commit()
+                pending = [
+                    (t.id, t.kind)
+                    for t in BackgroundTask.query.filter_by(status="pending").all()
+                ]
+            except Exception as e:
+                # e.g. the table doesn't exist yet (migrations not applied)
+                db.session.rollback()
+                logger.warning("[Tasks] could not requeue unfinished tasks: %s", e)
+                return
+
+        if reset:
+            logger.warning("[Tasks] %s task(s) lost their worker; back to pending", reset)
+        queued = sum(self._enqueue(task_id, kind) for task_id, kind in pending)
+        if queued:
+            logger.info("[Tasks] requeued %s unfinished task(s)", queued)
+
+    def _run(self, task_id):
+        with self._lock:
+            self._queued.discard(task_id)
+        with self.app.app_context():
+            now = datetime.utcnow()
+            claimed = BackgroundTask.query.filter_by(
+                id=task_id, status="pending"
+            ).update({"status": "running", "owner": WORKER_ID, "started_at": now, "heartbeat_at": now})
+            db.session.commit()
+            if not claimed:
+                return  # already taken by another worker, or cancelled
+
+            task = db.session.get(BackgroundTask, task_id)
+            try:
+                _handlers[task.kind](task, json.loads(task.payload))
+                task.status = "done"
+            except Exception as e:
+                logger.error("[Tasks] %s task %s failed: %s", task.kind, task_id, e)
+                db.session.rollback()
+                task = db.session.get(BackgroundTask, task_id)
+                task.status = "failed"
+                task.error = str(e)
+
+            task.finished_at = datetime.utcnow()
+            db.session.commit()
+
+
+task_queue = TaskQueue()
+
+
+def latest_task(user_id, kind):
+    return (
+        BackgroundTask.query
+        .filter_by(user_id=user_id, kind=kind)
+        .order_by(BackgroundTask.id.desc())
+        .first()
+    )
+
+
+def _has_active_task(kind) -> bool:
+    return BackgroundTask.query.filter(
+        BackgroundTask.kind == kind,
+        BackgroundTask.status.in_(("pending", "running")),
+    ).first() is not None
+
+
+# — Task handlers
+
+@task_handler("resume_analysis")
+def analyze_resume_task(task, payload):
+    """Run DeepSeek analysis on an uploaded PDF and store the ResumeAnalysis."""
+    from .models import User, ResumeAnalysis, UserPreference
+    from .utils import process_resume_file, embed_resume, EMBEDDING_VERSION
+
+    result = process_resume_file(payload["path"])
+
+    user = db.session.get(User, task.user_id)
+    if user is None or user.resume_filename != payload["filename"]:
+        logger.info("[Tasks] resume %s was replaced or deleted; dropping result", payload["filename"])
+        return
+
+    # Remove old analysis & store new; ranked jobs for the old one are invalid
+    ResumeAnalysis.query.filter_by(user_id=task.user_id).delete()
+    UserPreference.query.filter_by(user_id=task.user_id).update({"job_results": None})
+
+    ra = ResumeAnalysis(
+        user_id=task.user_id,
+        skills=json.dumps(result["skills"]),
+        projects=json.dumps(result["projects"]),
+        experience=json.dumps(result["experience"]),
+        experience_years=result["experience_years"],
+        suggested_roles=json.dumps(result["roles"])
+    )
+
+    # Embed the resume once here; /fetch_jobs reuses the stored vector
+    ra.set_resume_embedding(
+        embed_resume(ra.skills, result["projects"], result["experience"]),
+        EMBEDDING_VERSION
+    )
+
+    db.session.add(ra)
+    db.session.commit()
+
+    if result["processing_status"] == "failed":
+        raise RuntimeError(result.get("error_message", "Resume analysis failed"))
+
+
+@task_handler("job_search")
+def job_search_task(task, payload):
+    """Run the fetch → filter → rank pipeline, recording progress as it goes."""
+    from .models import ResumeAnalysis, UserPreference
+    from .pipeline import run_job_search, save_job_results, analysis_key, job_index
+
+    analysis = ResumeAnalysis.query.filter_by(user_id=task.user_id).first()
+    preferences = UserPreference.query.filter_by(user_id=task.user_id).first()
+    if not analysis or not preferences:
+        raise RuntimeError("Missing analysis or preferences.")
+
+    state = {}
+    last_write = [0.0]
+
+    def progress(**info):
+        new_stage = info.get("stage") != state.get("stage")
+        state.update(info)
+        now = time.monotonic()
+        # page updates are frequent; write them at most twice a second
+        if new_stage or now - last_write[0] >= 0.5:
+            task.progress = json.dumps(state)
+            db.session.commit()
+            last_write[0] = now
+
+    searched_for = analysis_key(analysis)
+    result = run_job_search(analysis, preferences, progress)
+
+    # The search added to the corpus index; retraining its IVF centroids
+    # (k-means) runs as a task of its own instead of holding this one up
+    if job_index.ivf_due() and not _has_active_task("build_job_index"):
+        task_queue.submit(task.user_id, "build_job_index")
+
+    # The resume may have been re-analysed meanwhile (the row is replaced,
+    # often under the same id, so re-read it rather than trust the session)
+    current = (
+        ResumeAnalysis.query.filter_by(user_id=task.user_id)
+        .execution_options(populate_existing=True).first()
+    )
+    if current is None or analysis_key(current) != searched_for:
+        logger.info("[Tasks] resume changed during job search %s; dropping results", task.id)
+        state["stage"] = "done"
+        task.progress = json.dumps(state)
+        task.result = json.dumps({"valid_count": 0, "stale": True})
+        return
+
+    # Results live on the preferences (ids + scores); the task keeps a summary
+    save_job_results(preferences, analysis, result)
+    state["stage"] = "done"
+    task.progress = json.dumps(state)
+    task.result = json.dumps({"valid_count": result["valid_count"]})
+
+
+@task_handler("build_job_index")
+def build_job_index_task(task, payload):
+    """Retrain the corpus index's IVF centroids (queued by job_search_task when due)."""
+    from .pipeline import job_index
+
+    trained = job_index.maybe_build_ivf()
+    task.result = json.dumps({"trained": trained, "corpus_size": len(job_index)})
@@ -1,18 +1,19 @@
 import json
 import os
 import logging
-import requests
 import fitz
+import time
 from time import sleep
+import hashlib
+import threading
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
+from .cache import make_cache, make_key, MISSING
+from .metrics import registry, timer, timed
+from .logging_config import log_payload
+from .key_pool import KeyPool, backoff_delay
 
-# — configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    filename="resume_parser.log",
-)
+# Logging is configured once in create_app (see logging_config.py)
 logger = logging.getLogger(__name__)
 
 # — your DeepSeek keys and endpoint
@@ -23,38 +24,14 @@ DEEPSEEK_KEYS = [
 API_URL     = "https://api.deepseek.com/v1/chat/completions"
 MAX_RETRIES = 3
 RETRY_DELAY = 2
+RETRY_MAX_WAIT = 20  # seconds of backoff one analysis may sleep in total
+DEEPSEEK_MODEL = "deepseek-chat"
 
-class PDFError(Exception):
-    pass
-
-def pdf_to_text(pdf_path: str) -> str:
-    """Extract text from a PDF using PyMuPDF."""
-    if not Path(pdf_path).exists():
-        raise PDFError(f"File not found: {pdf_path}")
-
-    text_chunks = []
-    try:
-        doc = fitz.open(pdf_path)
-        for page in doc:
-            text_chunks.append(page.get_text())
-        doc.close()
-
-    except Exception as e:
-        raise PDFError(f"Error reading PDF: {e}")
+deepseek_key_pool = KeyPool("deepseek", DEEPSEEK_KEYS)
 
-    full = "\n".join(text_chunks).strip()
-    if not full:
-        raise PDFError("Extracted text is empty.")
-    logger.info(f"[PDF → text] {len(full)} chars")
-    return full
+INSTANCE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "instance")
 
-def analyze_with_deepseek(resume_text: str) -> Dict:
-    """
-    Calls DeepSeek’s chat endpoint with your prompt, rotates keys on error,
-    and returns a dict containing:
-      { skills, projects, experience, experience_years, suggested_roles }
-    """
-    PROMPT = (
+DEEPSEEK_PROMPT = (
     "You are an expert AI resume parser and career advisor.\n\n"
 
     "Your task is to analyze the provided resume text and extract the following fields with precision:\n\n"
@@ -95,60 +72,164 @@ def analyze_with_deepseek(resume_text: str) -> Dict:
     '  "experience_years": 1,\n'
     '  "suggested_roles": ["Python Developer", "Machine Learning Engineer"]\n'
     "}"
-    )
+)
+
+# Cached analyses are only valid for the prompt/model that produced them
+ANALYSIS_VERSION = hashlib.sha256(f"{DEEPSEEK_MODEL}\n{DEEPSEEK_PROMPT}".encode("utf-8")).hexdigest()[:12]
+
+# — analyses of previously seen resumes, keyed by PDF-bytes hash and by text hash
+resume_analysis_cache = make_cache(
+    "resume_analyses",
+    backend="sqlite",
+    path=os.path.join(INSTANCE_DIR, "resume_analyses.db"),
+    maxsize=10000,
+    ttl=30 * 24 * 60 * 60,
+)
+_saved_api_seconds = 0.0
+_saved_lock = threading.Lock()
+
+# — PDF extraction budgets (resumes are a few pages; anything beyond is noise)
+PDF_MAX_PAGES = 15
+PDF_MAX_CHARS = 30000
+
+class PDFError(Exception):
+    pass
+
+def _open_pdf(source):
+    """Open a PDF from a path, raw bytes, or a binary file-like object (e.g. an upload)."""
+    if isinstance(source, (bytes, bytearray)):
+        return fitz.open(stream=source, filetype="pdf")
+    if hasattr(source, "read"):
+        return fitz.open(stream=source.read(), filetype="pdf")
+    if not Path(source).exists():
+        raise PDFError(f"File not found: {source}")
+    return fitz.open(source)
+
+def iter_pdf_pages(source, max_pages: int = PDF_MAX_PAGES, max_chars: int = PDF_MAX_CHARS):
+    """
+    Yield the text of a PDF page by page, stopping after max_pages pages or
+    max_chars characters (the page that crosses the budget is truncated).
+    Pages are loaded one at a time, so huge documents are never held in full.
+    """
+    doc = _open_pdf(source)
+    try:
+        total_chars = 0
+        for page_no, page in enumerate(doc, start=1):
+            if page_no > max_pages:
+                logger.warning("[PDF] stopped at page budget (%s of %s pages)", max_pages, doc.page_count)
+                break
+
+            started = time.perf_counter()
+            text = page.get_text()
+            logger.info("[PDF] page %s: %s chars in %.1fms", page_no, len(text), (time.perf_counter() - started) * 1000)
+
+            if total_chars + len(text) >= max_chars:
+                yield text[:max_chars - total_chars]
+                logger.warning("[PDF] stopped at character budget (%s chars, page %s)", max_chars, page_no)
+                break
+
+            total_chars += len(text)
+            yield text
+    finally:
+        doc.close()
+
+def pdf_to_text(source) -> str:
+    """Extract text from a PDF (path, bytes or file-like) using PyMuPDF, within the page/char budgets."""
+    try:
+        full = "\n".join(iter_pdf_pages(source)).strip()
+    except PDFError:
+        raise
+    except Exception as e:
+        raise PDFError(f"Error reading PDF: {e}")
+
+    if not full:
+        raise PDFError("Extracted text is empty.")
+    logger.info("[PDF → text] %s chars", len(full))
+    return full
 
-    headers = { "Content-Type": "application/json" }
+DEEPSEEK_REQUESTS = registry.counter("deepseek_requests_total", "DeepSeek API attempts by response status")
+
+@timed("deepseek_analysis")
+def _request_analysis(resume_text: str) -> Optional[Dict]:
+    """
+    Calls DeepSeek’s chat endpoint with the prompt, taking keys from
+    deepseek_key_pool (rate-limited keys rest while others are used).
+    Returns { skills, projects, experience, experience_years, roles }, or
+    None once every key and retry has failed.
+    """
     last_err = None
     required_keys = {"skills", "projects", "experience", "experience_years", "suggested_roles"}
+    payload = {
+        "model": DEEPSEEK_MODEL,
+        "messages": [
+            { "role": "system", "content": DEEPSEEK_PROMPT },
+            { "role": "user",   "content": resume_text }
+        ],
+        "temperature": 0.2,
+        "max_tokens": 1500,
+        "response_format": { "type": "json_object" }
+    }
+
+    # Same attempt budget as before (MAX_RETRIES per key); the pool decides
+    # which key each attempt uses and how long rate-limited keys rest.
+    max_attempts = len(deepseek_key_pool) * MAX_RETRIES
+    wait_left = RETRY_MAX_WAIT
+    for attempt in range(1, max_attempts + 1):
+        key_no = deepseek_key_pool.acquire()
+        if key_no is None:
+            last_err = last_err or "no DeepSeek key available"
+            break
+
+        resp = None
+        try:
+            headers = {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {deepseek_key_pool.keys[key_no]}",
+            }
+            logger.info("[DeepSeek] key=%s attempt=%s", key_no, attempt)
+            resp = http_client.post("deepseek", API_URL, headers=headers, json=payload)
+
+            DEEPSEEK_REQUESTS.inc(status=str(resp.status_code))
+            if resp.status_code == 429:
+                logger.warning("[DeepSeek] key=%s rate limited", key_no)
+                last_err = "rate limited"
+                continue
+
+            resp.raise_for_status()
+            data = resp.json()
+            raw  = data["choices"][0]["message"]["content"]
+            log_payload(logger, "[DeepSeek raw]", raw)
+
+            parsed = json.loads(raw)
+
+            if not required_keys.issubset(parsed):
+                raise ValueError(f"Missing one of required keys → found: {list(parsed.keys())}")
+
+            return {
+                "skills"          : parsed["skills"],
+                "projects"        : parsed["projects"],
+                "experience"      : parsed["experience"],
+                "experience_years": parsed["experience_years"],
+                "roles"           : parsed["suggested_roles"],
+            }
 
-    for key in DEEPSEEK_KEYS:
-        for attempt in range(1, MAX_RETRIES + 1):
-            try:
-                headers["Authorization"] = f"Bearer {key}"
-                payload = {
-                    "model": "deepseek-chat",
-                    "messages": [
-                        { "role": "system", "content": PROMPT },
-                        { "role": "user",   "content": resume_text }
-                    ],
-                    "temperature": 0.2,
-                    "max_tokens": 1500,
-                    "response_format": { "type": "json_object" }
-                }
-
-                logger.info(f"[DeepSeek] key={key[:4]} attempt={attempt}")
-                resp = requests.post(API_URL, headers=headers, json=payload, timeout=30)
-
-                if resp.status_code == 429:
-                    delay = RETRY_DELAY * attempt
-                    logger.warning(f"Rate limited → sleeping {delay}s")
-                    sleep(delay)
-                    continue
-
-                resp.raise_for_status()
-                data = resp.json()
-                raw  = data["choices"][0]["message"]["content"]
-                logger.debug(f"[DeepSeek raw] {raw}")
-
-                parsed = json.loads(raw)
-
-                if not required_keys.issubset(parsed):
-                    raise ValueError(f"Missing one of required keys → found: {list(parsed.keys())}")
-
-                return {
-                    "skills"          : parsed["skills"],
-                    "projects"        : parsed["projects"],
-                    "experience"      : parsed["experience"],
-                    "experience_years": parsed["experience_years"],
-                    "roles"           : parsed["suggested_roles"],
-                }
-
-            except Exception as e:
-                last_err = str(e)
-                logger.error(f"[DeepSeek error] {e}")
-                sleep(RETRY_DELAY)
-
-    logger.critical(f"All DeepSeek calls failed: {last_err}")
+        except Exception as e:
+            if resp is None:
+                DEEPSEEK_REQUESTS.inc(status="error")  # no response at all
+            last_err = str(e)
+            logger.error("[DeepSeek error] %s", e)
+            if resp is not None and resp.status_code < 400 and attempt < max_attempts:
+                # the key is fine, the answer wasn't: back off before asking again
+                delay = min(backoff_delay(attempt, base=RETRY_DELAY), wait_left)
+                wait_left -= delay
+                sleep(delay)
+        finally:
+            deepseek_key_pool.release(key_no, resp)
+
+    logger.critical("All DeepSeek calls failed: %s", last_err)
+    return None
+
+def _empty_analysis() -> Dict:
     return {
         "skills"          : "",
         "projects"        : [],
@@ -157,19 +238,78 @@ def analyze_with_deepseek(resume_text: str) -> Dict:
         "roles"           : []
     }
 
-def process_resume_file(pdf_path: str) -> Dict:
+def analyze_with_deepseek(resume_text: str) -> Dict:
+    """
+    Calls DeepSeek’s chat endpoint with your prompt, rotates keys on error,
+    and returns a dict containing:
+      { skills, projects, experience, experience_years, suggested_roles }
+    """
+    return _request_analysis(resume_text) or _empty_analysis()
+
+def _read_pdf_bytes(source) -> bytes:
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, "read"):
+        return source.read()
+    if not Path(source).exists():
+        raise PDFError(f"File not found: {source}")
+    return Path(source).read_bytes()
+
+def _cached_analysis(key) -> Optional[Dict]:
+    global _saved_api_seconds
+    entry = resume_analysis_cache.get(key)
+    if entry is MISSING:
+        return None
+    with _saved_lock:
+        _saved_api_seconds += entry["latency"]
+    return entry["result"]
+
+def resume_cache_stats() -> dict:
+    """Hit/miss counters of the resume analysis cache plus DeepSeek time saved."""
+    with _saved_lock:
+        saved = _saved_api_seconds
+    return {**resume_analysis_cache.stats(), "saved_api_seconds": round(saved, 2)}
+
+@timed("process_resume")
+def process_resume_file(pdf_source) -> Dict:
     """
     Full pipeline: extract text, call DeepSeek, return dict plus
-    a processing_status flag.
+    a processing_status flag. pdf_source is a path, bytes or file-like.
+
+    Resumes are fingerprinted by the hash of their bytes and of their
+    extracted text; a resume seen before (under the same ANALYSIS_VERSION)
+    is answered from resume_analysis_cache without calling DeepSeek.
     """
     try:
-        text = pdf_to_text(pdf_path)
-        logger.info(f"[RESUME TEXT]\n{text[:200]}...")
-        result = analyze_with_deepseek(text)
+        data = _read_pdf_bytes(pdf_source)
+        bytes_key = make_key("pdf", hashlib.sha256(data).hexdigest(), ANALYSIS_VERSION)
+        result = _cached_analysis(bytes_key)
+        if result is not None:
+            logger.info("[Resume cache] identical PDF seen before, skipping DeepSeek")
+            return { **result, "processing_status": "success" }
+
+        text = pdf_to_text(data)
+        logger.info("[RESUME TEXT]\n%.200s...", text)
+
+        text_key = make_key("text", hashlib.sha256(text.encode("utf-8")).hexdigest(), ANALYSIS_VERSION)
+        result = _cached_analysis(text_key)
+        if result is not None:
+            logger.info("[Resume cache] identical resume text seen before, skipping DeepSeek")
+            resume_analysis_cache.set(bytes_key, {"result": result, "latency": 0.0})
+            return { **result, "processing_status": "success" }
+
+        started = time.perf_counter()
+        result = _request_analysis(text)
+        if result is None:
+            result = _empty_analysis()  # not cached, so the next upload retries
+        else:
+            entry = {"result": result, "latency": time.perf_counter() - started}
+            resume_analysis_cache.set(text_key, entry)
+            resume_analysis_cache.set(bytes_key, entry)
         return { **result, "processing_status": "success" }
 
     except Exception as e:
-        logger.error(f"process_resume_file failed: {e}")
+        logger.error("process_resume_file failed: %s", e)
         return {
             "skills"          : "",
             "projects"        : [],
@@ -182,8 +322,10 @@ def process_resume_file(pdf_path: str) -> Dict:
 
 
 from .models import UserPreference, ResumeAnalysis
-import requests
+from . import http_client
 import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
 from flask_login import current_user
 
 # Your Adzuna API keys
@@ -193,89 +335,348 @@ adzuna_keys = [
     'enter all your api keys here'
 
 ]
+# Placeholder (non-dict) entries are skipped
+adzuna_key_pool = KeyPool("adzuna", [key for key in adzuna_keys if isinstance(key, dict)])
+
+
+# Adzuna search endpoint (override to point at a local stub server)
+ADZUNA_API_URL     = "https://api.adzuna.com/v1/api/jobs"
+ADZUNA_PAGE_SIZE   = 50  # Adzuna's maximum results_per_page
+ADZUNA_MAX_WORKERS = 8   # upper bound on concurrent Adzuna requests per search
+ADZUNA_MAX_ATTEMPTS = 3  # per page, across keys (at least one per key)
+
+# — search result cache ("memory" per process, or "sqlite" shared across workers)
+ADZUNA_CACHE_BACKEND = os.environ.get("ADZUNA_CACHE_BACKEND", "memory")
+ADZUNA_CACHE_PATH    = os.path.join(INSTANCE_DIR, "adzuna_cache.db")
+ADZUNA_CACHE_TTL     = 6 * 60 * 60   # seconds
+ADZUNA_CACHE_MAXSIZE = 20000         # pages
+
+adzuna_cache = make_cache(
+    "adzuna_pages",
+    backend=ADZUNA_CACHE_BACKEND,
+    path=ADZUNA_CACHE_PATH,
+    maxsize=ADZUNA_CACHE_MAXSIZE,
+    ttl=ADZUNA_CACHE_TTL,
+)
 
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-ch = logging.StreamHandler()
-ch.setLevel(logging.INFO)
-logger.addHandler(ch)
 
-def fetch_jobs_from_adzuna(role, country, city=None, is_remote=False, max_results=100):
+ADZUNA_REQUESTS = registry.counter("adzuna_requests_total", "Adzuna API requests by response status")
+
+
+def _adzuna_params(key, role, city=None, is_remote=False):
+    params = {
+        "app_id": key["app_id"],
+        "app_key": key["app_key"],
+        "results_per_page": ADZUNA_PAGE_SIZE,
+        "what": role,
+        "content-type": "application/json",
+    }
+
+    # Only pass city if it's not a remote job
+    if not is_remote and city:
+        params["where"] = city  # Adzuna automatically URL-encodes spaces
+
+    if is_remote:
+        params["remote"] = 1  # Correct parameter for remote jobs
+
+    return params
+
+
+def fetch_adzuna_page(role, country_code, page, city=None, is_remote=False, base_url=None):
+    """
+    Fetch a single results page with a key from adzuna_key_pool, moving on
+    to another key whenever one fails. Returns (jobs, count): the page's
+    job list ([] when the results run out) and Adzuna's total match count
+    (None if absent), or None if every attempt failed. Successful pages are served from
+    adzuna_cache until they expire.
+    """
+    cache_key = make_key(role, country_code, None if is_remote else city, is_remote, page, ADZUNA_PAGE_SIZE)
+    cached = adzuna_cache.get(cache_key)
+    if cached is not MISSING:
+        results, count = cached
+        return results, count
+
+    url = f"{base_url or ADZUNA_API_URL}/{country_code}/search/{page}"
+
+    tried = set()
+    for attempt in range(1, max(ADZUNA_MAX_ATTEMPTS, len(adzuna_key_pool)) + 1):
+        # prefer keys this page hasn't failed on yet; fall back to any key
+        key_no = adzuna_key_pool.acquire(exclude=tried, max_wait=0)
+        if key_no is None:
+            key_no = adzuna_key_pool.acquire()
+        if key_no is None:
+            logger.error("No Adzuna key available for page %s of %r", page, role)
+            break
+
+        params = _adzuna_params(adzuna_key_pool.keys[key_no], role, city, is_remote)
+        res = None
+        try:
+            logger.info("Request URL: %s what=%r where=%r key=%s", url, role, params.get("where"), key_no)
+            with timer("adzuna_page"):
+                res = http_client.get("adzuna", url, params=params)
+            ADZUNA_REQUESTS.inc(status=str(res.status_code))
+            logger.info("Response Status Code: %s", res.status_code)
+
+            if res.status_code != 200:
+                logger.warning("API failed with key %s, status code: %s. Response: %.500s", key_no, res.status_code, res.text)
+                tried.add(key_no)
+                continue
+
+            data = res.json()
+
+            # Full responses are tens of KB: log a size-capped sample (DEBUG) only
+            log_payload(logger, "Response Data", data)
+
+            results = data.get("results", [])
+            if not results:
+                logger.warning("No results found.")
+            count = data.get("count")
+            adzuna_cache.set(cache_key, [results, count])
+            return results, count
+
+        except Exception as e:
+            if res is None:
+                ADZUNA_REQUESTS.inc(status="error")  # no response at all
+            tried.add(key_no)
+            logger.error("Exception during API call: %s", e)
+        finally:
+            adzuna_key_pool.release(key_no, res)
+
+    return None
+
+
+@timed("adzuna_fetch")
+def fetch_jobs_for_roles(roles, country, city=None, is_remote=False, max_results=100,
+                         max_workers=ADZUNA_MAX_WORKERS, base_url=None, on_page=None,
+                         enough=None):
+    """
+    Fetch up to max_results jobs for each role, fanning out across roles and
+    pages on a bounded thread pool.
+
+    Pages are requested in windows (the pool is shared between the roles
+    still in flight) until a page comes back empty or max_results is
+    covered. Each role's first page is requested on its own: it reports
+    Adzuna's total "count", and pages past it are never requested. The merged list has the same order as
+    calling fetch_jobs_from_adzuna once per role: role by role, page by page.
+
+    on_page(pages_done, jobs_fetched), if given, is called on the calling
+    thread as each page completes. enough(window_jobs), if given, is called
+    with the jobs of each completed window; returning True stops fetching
+    for every role (the pages fetched so far are kept).
+    """
     # Convert country code to lowercase (e.g., "US" → "us")
     country_code = country.lower()  # Adzuna requires lowercase country codes
+    last_page = max(1, math.ceil(max_results / ADZUNA_PAGE_SIZE))
+
+    pages     = [{} for _ in roles]   # role index → {page: results}
+    next_page = [1] * len(roles)
+    role_last = [last_page] * len(roles)  # lowered to Adzuna's page count once known
+    planned   = [False] * len(roles)      # count seen (or absent) for this role
+    stop_page = {}                    # role index → first empty/failed page
+    active    = list(range(len(roles)))
+    pages_done = jobs_fetched = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while active:
+            window = max(1, max_workers // len(active))
+            futures = {}
+            for i in active:
+                first = next_page[i]
+                step = window if planned[i] else 1
+                for page in range(first, min(first + step, role_last[i] + 1)):
+                    fut = pool.submit(
+                        fetch_adzuna_page, roles[i], country_code, page,
+                        city, is_remote, base_url
+                    )
+                    futures[fut] = (i, page)
+                next_page[i] = first + step
+
+            window_jobs = []
+            for fut, (i, page) in futures.items():
+                results, count = fut.result() or (None, None)
+                if results:
+                    pages[i][page] = results
+                    window_jobs.extend(results)
+                else:
+                    stop_page[i] = min(stop_page.get(i, page), page)
+                if count is not None:
+                    role_last[i] = min(role_last[i], math.ceil(count / ADZUNA_PAGE_SIZE))
+                planned[i] = True
+
+                pages_done += 1
+                jobs_fetched += len(results or [])
+                if on_page:
+                    on_page(pages_done, jobs_fetched)
+
+            if enough and enough(window_jobs):
+                logger.info("Enough jobs after %s pages (%s jobs), stopping early", pages_done, jobs_fetched)
+                break
+
+            active = [
+                i for i in active
+                if i not in stop_page and next_page[i] <= role_last[i]
+            ]
 
     all_jobs = []
-    page = 1
-    used_keys = 0
+    for i in range(len(roles)):
+        role_jobs = []
+        for page in range(1, stop_page.get(i, last_page + 1)):
+            role_jobs.extend(pages[i].get(page, []))
+        all_jobs.extend(role_jobs[:max_results])
+
+    return all_jobs
 
+
+def fetch_jobs_from_adzuna(role, country, city=None, is_remote=False, max_results=100):
     # Log job search parameters
-    logger.info(f"Starting job search for role: {role}, country: {country_code}, city: {city}, remote: {is_remote}")
-
-    while len(all_jobs) < max_results and used_keys < len(adzuna_keys):
-        key = adzuna_keys[used_keys]
-
-        while len(all_jobs) < max_results:
-            url = f"https://api.adzuna.com/v1/api/jobs/{country_code}/search/{page}"
-            params = {
-                "app_id": key["app_id"],
-                "app_key": key["app_key"],
-                "results_per_page": 20,
-                "what": role,
-                "content-type": "application/json",
-            }
+    logger.info("Starting job search for role: %s, country: %s, city: %s, remote: %s", role, country.lower(), city, is_remote)
 
-            # Only pass city if it's not a remote job
-            if not is_remote and city:
-                params["where"] = city  # Adzuna automatically URL-encodes spaces
+    all_jobs = fetch_jobs_for_roles(
+        [role], country, city=city, is_remote=is_remote, max_results=max_results
+    )
 
-            if is_remote:
-                params["remote"] = 1  # Correct parameter for remote jobs
+    logger.info("Job search complete. Found %s jobs for role: %s", len(all_jobs), role)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Adzuna cache: %s", adzuna_cache.stats())  # runs a COUNT on the sqlite backend
+    return all_jobs
 
-            try:
-                logger.info(f"Request URL: {url} with params {params}")
-                res = requests.get(url, params=params)
-                logger.info(f"Response Status Code: {res.status_code}")
 
-                if res.status_code != 200:
-                    logger.warning(f"API failed with key {used_keys}, status code: {res.status_code}. Response: {res.text}")
-                    break
 
-                data = res.json()
+import numpy as np
+from .embeddings import EmbeddingStore, text_hash, encode_texts, EMBEDDING_VERSION
 
-                # Log full API response for debugging
-                logger.info(f"Response Data: {data}")
+EMBEDDING_STORE_PATH = os.path.join(INSTANCE_DIR, "job_embeddings.db")
 
-                results = data.get("results", [])
-                if not results:
-                    logger.warning("No results found.")
-                    break
+# Job vectors persisted across requests and workers
+job_embedding_store = EmbeddingStore(EMBEDDING_STORE_PATH, model_name=EMBEDDING_VERSION)
 
-                all_jobs.extend(results)
-                page += 1
+# What a job is embedded from: "description" (full text, else title) or
+# "title_snippet" (title + the first JOB_SNIPPET_CHARS of the description)
+JOB_TEXT_MODE = os.environ.get("JOB_TEXT_MODE", "description")
+JOB_SNIPPET_CHARS = int(os.environ.get("JOB_SNIPPET_CHARS", 300))
 
-            except Exception as e:
-                logger.error(f"Exception during API call: {e}")
-                break
+# Weight of the lexical score (BM25 + skill matches, see lexical.py) when
+# blended with the embedding cosine score; 0 = purely semantic ranking
+HYBRID_LEXICAL_WEIGHT = float(os.environ.get("HYBRID_LEXICAL_WEIGHT", 0.3))
 
-        used_keys += 1
 
-    logger.info(f"Job search complete. Found {len(all_jobs)} jobs for role: {role}")
-    return all_jobs[:max_results]
+JOB_EMBEDDINGS = registry.counter("job_embeddings_total", "Job vectors served, by source (cached/encoded)")
 
 
+@timed("embed")
+def embed_job_texts(jobs: list, job_texts: list) -> np.ndarray:
+    """
+    Return normalized embeddings for job_texts, reading warm vectors from
+    job_embedding_store and encoding only the misses.
+    """
+    keys = [(str(job.get("id") or ""), text_hash(text)) for job, text in zip(jobs, job_texts)]
+    vectors = job_embedding_store.get_many(keys)
+
+    missing = [i for i, key in enumerate(keys) if key not in vectors]
+    if missing:
+        encoded = encode_texts([job_texts[i] for i in missing])
+        new_items = [(keys[i], vec) for i, vec in zip(missing, encoded)]
+        job_embedding_store.put_many(new_items)
+        vectors.update(new_items)
+
+    JOB_EMBEDDINGS.inc(len(keys) - len(missing), source="cached")
+    JOB_EMBEDDINGS.inc(len(missing), source="encoded")
+    logger.info("[Embeddings] %s cached, %s encoded", len(keys) - len(missing), len(missing))
+    return np.vstack([vectors[key] for key in keys]).astype(np.float32)
+
+
+def job_text(job: dict, mode: str = None) -> str:
+    """The text that represents a job for embedding (see JOB_TEXT_MODE)."""
+    if (mode or JOB_TEXT_MODE) == "title_snippet":
+        title = job.get("title") or ""
+        snippet = (job.get("description") or "")[:JOB_SNIPPET_CHARS]
+        return f"{title}. {snippet}" if snippet else title
+    # prefer full description if available, else title
+    return job.get("description") or job.get("title", "")
+
+
+def build_resume_text(resume_skills: str, resume_projects: list, resume_experience: list) -> str:
+    """The text that represents a resume for embedding."""
+    return "\n".join([
+        resume_skills,
+        *resume_projects,
+        *resume_experience
+    ])
+
 
-from sentence_transformers import SentenceTransformer
-import numpy as np
+def embed_resume(resume_skills: str, resume_projects: list, resume_experience: list) -> np.ndarray:
+    """Normalized embedding of a resume (stored on ResumeAnalysis at upload time)."""
+    resume_text = build_resume_text(resume_skills, resume_projects, resume_experience)
+    return encode_texts([resume_text])[0]
+
+
+def top_k_scores(scores: np.ndarray, top_k: int) -> list:
+    """
+    [(index, score)] of the top_k highest scores, best first. Only the k
+    winners are sorted (argpartition is O(n)), not the whole array.
+    """
+    top_k = min(top_k, len(scores))
+    if top_k <= 0:
+        return []
+    if top_k < len(scores):
+        winners = np.argpartition(-scores, top_k - 1)[:top_k]
+    else:
+        winners = np.arange(len(scores))
+    winners = winners[np.argsort(-scores[winners], kind="stable")]
+    return [(int(i), float(scores[i])) for i in winners]
+
+
+@timed("rank")
+def rank_job_indices(
+    resume_skills: str,
+    resume_projects: list,
+    resume_experience: list,
+    jobs: list,
+    top_k: int = 20,
+    resume_embedding: np.ndarray = None,
+    lexical_scores: np.ndarray = None,
+    job_embeddings: np.ndarray = None
+) -> list:
+    """
+    Score each job against the resume and return the top_k as
+    [(index into jobs, score)], sorted by descending score. Arguments are
+    the same as rank_jobs_by_similarity, plus job_embeddings (one row per
+    job, if the caller has embedded them already); no job dict is copied.
+    """
+    if not jobs:
+        return []
+
+    # 1) Resume vector (precomputed at upload, else encoded now)
+    if resume_embedding is None:
+        resume_embedding = embed_resume(resume_skills, resume_projects, resume_experience)
+    resume_emb = resume_embedding
+
+    # 2) + 3) Embed the job texts via the persistent embedding store, unless given
+    job_embs = job_embeddings
+    if job_embs is None:
+        job_embs = embed_job_texts(jobs, [job_text(job) for job in jobs])
+
+    # 4) Compute cosine similarities
+    # cos_sim = resume_emb · job_emb / (||resume_emb|| * ||job_emb||)
+    # since we normalized embeddings, dot product = cosine similarity
+    scores = np.dot(job_embs, resume_emb)
+
+    # 5) Blend in the lexical scores (hybrid ranking), if given
+    if lexical_scores is not None and HYBRID_LEXICAL_WEIGHT > 0:
+        scores = (1 - HYBRID_LEXICAL_WEIGHT) * scores + HYBRID_LEXICAL_WEIGHT * lexical_scores
+
+    # 6) Select the top_k without sorting the rest
+    return top_k_scores(scores, top_k)
 
-# Load once at import time (singleton)
-_model = SentenceTransformer("sentence-transformers/msmarco-MiniLM-L6-cos-v5")
 
 def rank_jobs_by_similarity(
     resume_skills: str,
     resume_projects: list,
     resume_experience: list,
     jobs: list,
-    top_k: int = 20
+    top_k: int = 20,
+    resume_embedding: np.ndarray = None,
+    lexical_scores: np.ndarray = None
 ) -> list:
     """
     Given resume fields and a list of job dicts, compute a similarity score
@@ -285,41 +686,15 @@ def rank_jobs_by_similarity(
     - resume_projects/experience: lists of strings
     - jobs: list of dicts, each must have a 'description' or 'title' key
     - top_k: return at most this many jobs
+    - resume_embedding: precomputed resume vector; encoded from the
+      resume fields when not given
+    - lexical_scores: per-job scores in [0, 1] (lexical.LexicalScorer)
+      blended in with weight HYBRID_LEXICAL_WEIGHT
+
+    Only the returned top_k jobs are copied (with "match_score" attached).
     """
-    # 1) Prepare resume text  
-    resume_text = "\n".join([
-        resume_skills,
-        *resume_projects,
-        *resume_experience
-    ])
-    
-    # 2) Collect job texts
-    job_texts = []
-    for job in jobs:
-        # prefer full description if available, else title
-        text = job.get("description") or job.get("title", "")
-        job_texts.append(text)
-    
-    # 3) Embed all texts in a single batch
-    embeddings = _model.encode(
-        [resume_text, *job_texts],
-        convert_to_tensor=False,
-        normalize_embeddings=True
+    ranked = rank_job_indices(
+        resume_skills, resume_projects, resume_experience, jobs, top_k,
+        resume_embedding, lexical_scores
     )
-    resume_emb, job_embs = embeddings[0], embeddings[1:]
-    
-    # 4) Compute cosine similarities
-    # cos_sim = resume_emb · job_emb / (||resume_emb|| * ||job_emb||)
-    # since we normalized embeddings, dot product = cosine similarity
-    scores = np.dot(job_embs, resume_emb)
-    
-    # 5) Sort by score descending
-    idx_sorted = np.argsort(-scores)
-    
-    top_jobs = []
-    for idx in idx_sorted[:top_k]:
-        job = jobs[idx].copy()
-        job["match_score"] = float(scores[idx])  # attach score
-        top_jobs.append(job)
-    
-    return top_jobs
+    return [{**jobs[i], "match_score": score} for i, score in ranked]
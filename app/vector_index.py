@@ -0,0 +1,316 @@
+"""
+Persistent vector index of every job we have ranked (each search's
+lexical shortlist, see pipeline.index_jobs), for ranking a resume against
+that corpus instead of one user's fresh fetch.
+
+Vectors and their filter metadata (country, location area, remote) live in
+a SQLite file shared by all workers; each process keeps an in-memory
+float32 matrix that it tops up incrementally (only rows it hasn't seen).
+
+Two search modes:
+  - "flat": exact dot product over every row that passes the filters.
+  - "ivf" : inverted-file approximation. Spherical k-means centroids are
+            trained with build_ivf(); a query only scans the rows of its
+            `nprobe` closest centroids. Centroids are persisted next to the
+            database, row assignments are recomputed in memory. Until
+            centroids exist, "ivf" searches fall back to "flat".
+
+Centroids are trained by `flask build-job-index`, and automatically
+(maybe_build_ivf, in a "build_job_index" background task queued after a
+search) once the corpus reaches IVF_MIN_ROWS jobs and again each time it
+grows IVF_RETRAIN_GROWTH-fold.
+
+benchmarks/eval_index_recall.py measures IVF recall against flat search.
+"""
+import logging
+import os
+import threading
+import time
+import numpy as np
+from .sqlite_local import LocalConnection, transaction
+
+logger = logging.getLogger(__name__)
+
+IVF_NPROBE = 8
+# Below this many jobs flat search is cheap enough; no centroids are trained
+IVF_MIN_ROWS = int(os.environ.get("IVF_MIN_ROWS", 20000))
+IVF_RETRAIN_GROWTH = 2.0
+
+
+def _normalize_area(job: dict) -> str:
+    """'|london|central london|' — lowercase location names, searchable by city."""
+    location = job.get("location") or {}
+    names = list(location.get("area") or [])
+    if location.get("display_name"):
+        names.append(location["display_name"])
+    return "|" + "|".join(n.strip().lower() for n in names if n) + "|"
+
+
+class JobIndex:
+    def __init__(self, path):
+        self.path = path
+        self.centroids_path = os.path.splitext(path)[0] + ".centroids.npy"
+        self._db = LocalConnection(
+            path,
+            "CREATE TABLE IF NOT EXISTS index_vectors ("
+            " row INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " job_id TEXT NOT NULL UNIQUE,"
+            " text_hash TEXT NOT NULL,"
+            " country TEXT NOT NULL,"
+            " area TEXT NOT NULL,"
+            " remote INTEGER NOT NULL,"
+            " vector BLOB NOT NULL)",
+        )
+        self._lock = threading.RLock()
+
+        self._n = 0
+        self._last_row = 0
+        self._vectors = None   # (capacity, dim) float32, rows [:_n] are live
+        self._ids = []         # position → job_id
+        self._pos = {}         # job_id → position
+        self._country = []
+        self._area = []
+        self._remote = []
+        self._meta = None      # cached numpy views of the metadata lists
+
+        self._centroids = None
+        self._assign = None    # position → centroid number
+        self._centroids_mtime = None
+        self._trained_on = 0   # corpus size the current centroids were trained on
+        self._training = False
+
+    def _conn(self):
+        return self._db.get()
+
+    def add(self, jobs, vectors, text_hashes, country, remote=False):
+        """
+        Upsert jobs with their (normalized) vectors. Jobs already indexed
+        with the same text hash are skipped, so re-adding a search is cheap.
+        """
+        conn = self._conn()
+        ids = [str(job.get("id") or "") for job in jobs]
+        known = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            known.update(conn.execute(
+                f"SELECT job_id, text_hash FROM index_vectors WHERE job_id IN ({placeholders})",
+                chunk,
+            ).fetchall())
+
+        rows = []
+        for job_id, job, vector, digest in zip(ids, jobs, vectors, text_hashes):
+            if not job_id or known.get(job_id) == digest:
+                continue
+            rows.append((
+                job_id, digest, country.lower(), _normalize_area(job), int(bool(remote)),
+                np.asarray(vector, dtype=np.float16).tobytes(),
+            ))
+        if not rows:
+            return 0
+
+        with transaction(conn):
+            conn.executemany(
+                "INSERT OR REPLACE INTO index_vectors"
+                " (job_id, text_hash, country, area, remote, vector) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    # — in-memory view
+
+    def refresh(self):
+        """Load rows added (by any process) since the last refresh."""
+        with self._lock:
+            rows = self._conn().execute(
+                "SELECT row, job_id, country, area, remote, vector FROM index_vectors"
+                " WHERE row > ? ORDER BY row",
+                (self._last_row,),
+            ).fetchall()
+            changed = []
+            for row, job_id, country, area, remote, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+                pos = self._pos.get(job_id)
+                if pos is None:
+                    pos = self._append_slot(vector.shape[0])
+                    self._pos[job_id] = pos
+                    self._ids.append(job_id)
+                    self._country.append(country)
+                    self._area.append(area)
+                    self._remote.append(bool(remote))
+                else:
+                    self._country[pos], self._area[pos], self._remote[pos] = country, area, bool(remote)
+                self._vectors[pos] = vector
+                changed.append(pos)
+                self._last_row = row
+
+            if changed:
+                self._meta = None
+                if self._centroids is not None:
+                    self._assign_rows(np.array(changed))
+            self._load_centroids()
+
+    def _append_slot(self, dim):
+        if self._vectors is None:
+            self._vectors = np.zeros((1024, dim), dtype=np.float32)
+        elif self._n == self._vectors.shape[0]:
+            grown = np.zeros((self._n * 2, dim), dtype=np.float32)
+            grown[:self._n] = self._vectors
+            self._vectors = grown
+        self._n += 1
+        return self._n - 1
+
+    def __len__(self):
+        return self._n
+
+    def _metadata(self):
+        if self._meta is None:
+            self._meta = (
+                np.array(self._country, dtype=object),
+                self._area,
+                np.array(self._remote, dtype=bool),
+            )
+        return self._meta
+
+    def _filter_mask(self, country=None, city=None, remote=None):
+        if country is None and city is None and remote is None:
+            return None
+        countries, areas, remotes = self._metadata()
+        mask = np.ones(self._n, dtype=bool)
+        if country is not None:
+            mask &= countries == country.lower()
+        if remote is not None:
+            mask &= remotes == bool(remote)
+        if city:
+            needle = f"|{city.strip().lower()}|"
+            mask &= np.fromiter((needle in area for area in areas), dtype=bool, count=self._n)
+        return mask
+
+    # — IVF
+
+    def build_ivf(self, nlist=None, iterations=10, sample_size=20000, seed=0):
+        """Train spherical k-means centroids over the current corpus and persist them."""
+        self.refresh()
+        with self._lock:
+            n = self._n
+            if n == 0:
+                return
+            nlist = min(nlist or max(1, int(np.sqrt(n))), n)
+            rng = np.random.default_rng(seed)
+            # a copy, so searches can go on while the centroids train
+            sample = self._vectors[np.sort(rng.choice(n, size=min(sample_size, n), replace=False))]
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+        centroids = centroids.astype(np.float32)
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.centroids_path)), exist_ok=True)
+        with self._lock:
+            np.save(self.centroids_path, centroids)
+            self._centroids_mtime = os.path.getmtime(self.centroids_path)
+            self._set_centroids(centroids)
+            self._trained_on = n
+        logger.info("[JobIndex] trained %s IVF lists over %s jobs", nlist, n)
+
+    def _ivf_due(self, min_rows, growth) -> bool:
+        return self._n >= min_rows and (
+            self._centroids is None or self._n >= self._trained_on * growth
+        )
+
+    def ivf_due(self, min_rows=IVF_MIN_ROWS, growth=IVF_RETRAIN_GROWTH) -> bool:
+        """Are centroids missing (for a corpus of min_rows+) or trained on a corpus `growth` times smaller?"""
+        self.refresh()
+        with self._lock:
+            return self._ivf_due(min_rows, growth)
+
+    def maybe_build_ivf(self, min_rows=IVF_MIN_ROWS, growth=IVF_RETRAIN_GROWTH) -> bool:
+        """Train centroids if ivf_due(); True if they were trained."""
+        self.refresh()
+        with self._lock:
+            if not self._ivf_due(min_rows, growth) or self._training:
+                return False
+            self._training = True
+        try:
+            self.build_ivf()
+        finally:
+            with self._lock:
+                self._training = False
+        return True
+
+    def _load_centroids(self):
+        try:
+            mtime = os.path.getmtime(self.centroids_path)
+        except OSError:
+            return
+        if mtime != self._centroids_mtime and self._vectors is not None:
+            centroids = np.load(self.centroids_path)
+            if centroids.shape[1] == self._vectors.shape[1]:
+                self._set_centroids(centroids)
+                # trained elsewhere (another worker or the CLI) on a corpus at most this large
+                self._trained_on = self._n
+            self._centroids_mtime = mtime
+
+    def _set_centroids(self, centroids):
+        self._centroids = centroids
+        self._assign = np.zeros(self._vectors.shape[0], dtype=np.int32)
+        self._assign_rows(np.arange(self._n))
+
+    def _assign_rows(self, positions):
+        if len(self._assign) < self._vectors.shape[0]:
+            grown = np.zeros(self._vectors.shape[0], dtype=np.int32)
+            grown[:len(self._assign)] = self._assign
+            self._assign = grown
+        for start in range(0, len(positions), 8192):
+            chunk = positions[start:start + 8192]
+            self._assign[chunk] = np.argmax(self._vectors[chunk] @ self._centroids.T, axis=1)
+
+    # — search
+
+    def search(self, query, k=100, country=None, city=None, remote=None,
+               mode="flat", nprobe=IVF_NPROBE) -> list:
+        """
+        Top-k (job_id, score) pairs by cosine similarity to `query` (a
+        normalized vector), restricted by the optional filters.
+        mode="ivf" falls back to "flat" until build_ivf() has been run.
+        """
+        self.refresh()
+        with self._lock:
+            if self._n == 0:
+                return []
+            started = time.perf_counter()
+            query = np.asarray(query, dtype=np.float32)
+            mask = self._filter_mask(country, city, remote)
+
+            if mode == "ivf" and self._centroids is not None:
+                nprobe = min(nprobe, len(self._centroids))
+                probe = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+                selected = np.isin(self._assign[:self._n], probe)
+                if mask is not None:
+                    selected &= mask
+                candidates = np.flatnonzero(selected)
+            elif mask is not None:
+                candidates = np.flatnonzero(mask)
+            else:
+                candidates = None
+
+            vectors = self._vectors[:self._n] if candidates is None else self._vectors[candidates]
+            if len(vectors) == 0:
+                return []
+            scores = vectors @ query
+
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            positions = top if candidates is None else candidates[top]
+
+            logger.info(
+                "[JobIndex] %s search over %s/%s jobs in %.1fms",
+                mode, len(scores), self._n, (time.perf_counter() - started) * 1000
+            )
+            return [(self._ids[p], float(s)) for p, s in zip(positions, scores[top])]
@@ -0,0 +1,89 @@
+"""
+Embedding throughput vs ranking quality across encode settings (CPU).
+
+Every setting encodes the same jobs and ranks them against the same
+resume; quality is measured against the reference setting (full
+descriptions, 512 tokens, one plain encode call):
+
+  - top@k  : overlap of the top k jobs with the reference top k
+  - spearman: rank correlation of all scores with the reference scores
+
+    python -m benchmarks.bench_embedding --jobs 1000 --top-k 50
+"""
+import argparse
+import time
+import numpy as np
+
+from app.embeddings import get_model, encode_texts
+from app.utils import job_text, build_resume_text
+from benchmarks.fixtures import synthetic_jobs
+
+RESUME = build_resume_text(
+    "python, django, flask, sql, docker, aws, rest apis",
+    ["Built a job recommendation service with Flask and sentence embeddings"],
+    ["3 years backend development with Python and PostgreSQL"],
+)
+
+# (label, text mode, max_seq_length, dynamic batching)
+SETTINGS = [
+    ("reference: description/512/plain", "description", 512, False),
+    ("description/512/dynamic", "description", 512, True),
+    ("description/256/dynamic", "description", 256, True),
+    ("description/128/dynamic", "description", 128, True),
+    ("title_snippet/128/dynamic", "title_snippet", 128, True),
+    ("title_snippet/64/dynamic", "title_snippet", 64, True),
+]
+
+
+def _ranks(scores):
+    ranks = np.empty(len(scores))
+    ranks[np.argsort(-scores)] = np.arange(len(scores))
+    return ranks
+
+
+def _encode(model, texts, dynamic, batch_size):
+    if dynamic:
+        return encode_texts(texts, model=model, batch_size=batch_size)
+    return model.encode(texts, batch_size=batch_size, convert_to_tensor=False, normalize_embeddings=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--description-sentences", type=int, default=8)
+    args = parser.parse_args()
+
+    jobs = synthetic_jobs(args.jobs, description_sentences=args.description_sentences)
+    model = get_model()
+    default_length = model.max_seq_length
+    model.encode(["warm-up"])
+
+    reference = None
+    try:
+        for label, mode, max_seq_length, dynamic in SETTINGS:
+            model.max_seq_length = max_seq_length
+            texts = [job_text(job, mode) for job in jobs]
+            resume = _encode(model, [RESUME], dynamic, 1)[0]
+
+            started = time.perf_counter()
+            vectors = _encode(model, texts, dynamic, args.batch_size)
+            elapsed = time.perf_counter() - started
+            scores = vectors @ resume
+
+            top = set(np.argsort(-scores)[:args.top_k])
+            if reference is None:
+                reference = (scores, top)
+            overlap = len(top & reference[1]) / args.top_k
+            spearman = np.corrcoef(_ranks(scores), _ranks(reference[0]))[0, 1]
+            print(
+                f"{label:<34} {len(jobs) / elapsed:8.1f} jobs/s  "
+                f"top@{args.top_k} {overlap:.2f}  spearman {spearman:.3f}"
+            )
+    finally:
+        model.max_seq_length = default_length
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Throughput and per-worker memory: shared embedding server vs in-process.
+
+Starts N worker processes that each encode job texts in request-sized
+chunks, first with every worker loading its own model ("local"), then
+against one app.embedding_server process ("server"), and prints
+texts/sec overall plus each worker's RSS (and the server's).
+
+    python -m benchmarks.bench_embedding_server --workers 4 --texts 500
+"""
+import argparse
+import multiprocessing as mp
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fixtures import synthetic_jobs
+
+
+def _worker(texts, request_size, results):
+    # imported here so the environment decides local vs server mode
+    from app.embeddings import encode_texts
+    from app.embedding_server import rss_mb, _client
+
+    encode_texts(texts[:1])  # connect / load the model outside the timing
+    started = time.perf_counter()
+    for start in range(0, len(texts), request_size):
+        encode_texts(texts[start:start + request_size])
+    results.put({
+        "seconds": time.perf_counter() - started,
+        "rss_mb": rss_mb(),
+        "stats": _client.stats() if _client else None,
+    })
+
+
+def _run(label, workers, texts, request_size):
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(texts, request_size, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    outcomes = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    wall = max(o["seconds"] for o in outcomes)
+    print(
+        f"{label:<7} {workers * len(texts) / wall:9.1f} texts/s  "
+        f"worker RSS MB {[o['rss_mb'] for o in outcomes]}"
+    )
+    return outcomes
+
+
+def _wait_for(address, timeout=120):
+    from app.embedding_server import EmbeddingClient
+    client = EmbeddingClient(address)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            client.stats()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("embedding server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--texts", type=int, default=500, help="texts per worker")
+    parser.add_argument("--request-size", type=int, default=50)
+    parser.add_argument("--address", default=None, help="default: a temporary Unix socket")
+    args = parser.parse_args()
+
+    texts = [job["description"] for job in synthetic_jobs(args.texts)]
+
+    os.environ.pop("EMBEDDING_SERVER_ADDRESS", None)
+    _run("local", args.workers, texts, args.request_size)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        address = args.address or os.path.join(tmp, "embeddings.sock")
+        os.environ["EMBEDDING_SERVER_ADDRESS"] = address
+        os.environ.setdefault("EMBEDDING_SERVER_AUTHKEY", secrets.token_hex(32))
+        server = subprocess.Popen([sys.executable, "-m", "app.embedding_server", "--address", address])
+        try:
+            _wait_for(address)
+            outcomes = _run("server", args.workers, texts, args.request_size)
+            stats = outcomes[-1]["stats"]
+            print(
+                f"server  RSS MB {stats['rss_mb']}  {stats['texts']} texts in {stats['batches']} batches  "
+                f"{stats['texts_per_sec']} texts/s encoding"
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Micro-benchmark: per-job cost of the experience/seniority filter.
+
+Compares the original inline loop from /fetch_jobs (patterns compiled per
+request, text lowercased twice, keyword lists scanned with `in`) against
+app.filters.filter_jobs, serial and on the process pool, and checks they
+all keep exactly the same jobs.
+
+    python -m benchmarks.bench_filters --jobs 3000 --repeat 5
+"""
+import argparse
+import re
+import time
+
+from app.filters import filter_jobs, PARALLEL_WORKERS, _EXPERIENCE_PATTERN, _word_to_number
+from benchmarks.fixtures import synthetic_jobs
+
+
+def _legacy_extract_required_experience(text):
+    if not text:
+        return 0.0
+
+    match = _EXPERIENCE_PATTERN.search(text)
+    if match:
+        for group_prefix in ['min1', 'min2', 'min3', 'min4', 'min5']:
+            if match.group(group_prefix):
+                return float(match.group(group_prefix))
+            word_value = _word_to_number(match.group(f"{group_prefix}_word"))
+            if word_value > 0:
+                return word_value
+
+    text_lower = text.lower()
+    no_exp_keywords = [
+        "no experience", "fresher", "entry level", "training provided",
+        "on the job training", "gain experience", "will be trained", "learn"
+    ]
+    if any(phrase in text_lower for phrase in no_exp_keywords):
+        return 0.0
+    if "experience" in text_lower or 'exp' in text_lower:
+        return 1.0
+    return 0.0
+
+
+def legacy_filter(deduped, candidate_exp):
+    valid_jobs = []
+    for job in deduped:
+        desc = job.get("description", "") or job.get("snippet", "")
+        desc_lower = desc.lower()
+        req_exp = _legacy_extract_required_experience(desc)
+        if "experience" in desc_lower and req_exp == 1.0:
+            continue
+        if candidate_exp >= req_exp:
+            valid_jobs.append(job)
+
+    senior_keywords = ["senior", "sr", "lead", "manager", "principal", "architect", "head", "director", "vp", "executive"]
+    junior_keywords = ["junior", "jr", "intern", "fresher", "graduate", "entry-level", "entry level", "associate"]
+    senior_pattern = re.compile(r'\b(' + '|'.join(senior_keywords) + r')\b', re.IGNORECASE)
+    junior_pattern = re.compile(r'\b(' + '|'.join(junior_keywords) + r')\b', re.IGNORECASE)
+
+    filtered_jobs = []
+    for job in valid_jobs:
+        title_lower = (job.get("title") or "").lower()
+        if candidate_exp < 3:
+            if not senior_pattern.search(title_lower):
+                filtered_jobs.append(job)
+        elif candidate_exp >= 4:
+            if not junior_pattern.search(title_lower):
+                filtered_jobs.append(job)
+        else:
+            filtered_jobs.append(job)
+    return filtered_jobs
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    jobs = synthetic_jobs(args.jobs)
+    for candidate_exp in (2.0, 3.5, 5.0):
+        legacy_t, legacy = _best_of(lambda: legacy_filter(jobs, candidate_exp), args.repeat)
+        engine_t, engine = _best_of(lambda: filter_jobs(jobs, candidate_exp, parallel=False), args.repeat)
+        pool_t, pooled = _best_of(lambda: filter_jobs(jobs, candidate_exp, parallel=True), args.repeat)
+        assert [j["id"] for j in legacy] == [j["id"] for j in engine], "filters disagree"
+        assert [j["id"] for j in engine] == [j["id"] for j in pooled], "pool disagrees"
+
+        print(
+            f"exp={candidate_exp:<4} kept={len(engine):>5}/{len(jobs)}  "
+            f"legacy {legacy_t / len(jobs) * 1e6:7.2f} µs/job  "
+            f"engine {engine_t / len(jobs) * 1e6:7.2f} µs/job  "
+            f"pool({PARALLEL_WORKERS}) {pool_t / len(jobs) * 1e6:7.2f} µs/job  "
+            f"({legacy_t / engine_t:.2f}x / {legacy_t / pool_t:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Micro-benchmark: logging cost of one Adzuna results page in the request thread.
+
+Compares the original setup (logging.basicConfig file handler written
+synchronously, full response dict formatted into an INFO f-string on
+every page) against app.logging_config (queue handler, lazy %-style
+arguments, sampled and size-capped payloads via log_payload). Reports
+CPU time spent in the calling thread per page and bytes written to the
+log file.
+
+    python -m benchmarks.bench_logging --pages 500 --page-size 50
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from app import logging_config
+from benchmarks.fixtures import synthetic_jobs
+
+
+def _legacy_page(logger, url, params, data):
+    logger.info(f"Request URL: {url} with params {params}")
+    logger.info(f"Response Status Code: {200}")
+    logger.info(f"Response Data: {data}")
+
+
+def _current_page(logger, url, params, data):
+    logger.info("Request URL: %s what=%r where=%r key=%s", url, params["what"], params.get("where"), 0)
+    logger.info("Response Status Code: %s", 200)
+    logging_config.log_payload(logger, "Response Data", data)
+
+
+def _reset_root():
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+
+
+def run(page_fn, configure, pages, data, log_file):
+    _reset_root()
+    configure(log_file)
+    logger = logging.getLogger("app.utils")
+    url = "https://api.adzuna.com/v1/api/jobs/gb/search/1"
+    params = {"app_id": "id", "app_key": "secret", "what": "Python Developer", "where": "London"}
+
+    started = time.thread_time()
+    for _ in range(pages):
+        page_fn(logger, url, params, data)
+    cpu = time.thread_time() - started
+
+    logging_config.shutdown_logging()  # drain the queue before measuring the file
+    _reset_root()
+    return cpu, os.path.getsize(log_file)
+
+
+def _legacy_config(log_file):
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        filename=log_file,
+    )
+
+
+def _current_config(log_file):
+    logging_config.configure_logging(level="INFO", log_file=log_file, console=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    data = {"count": args.pages * args.page_size, "results": synthetic_jobs(args.page_size)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_cpu, legacy_bytes = run(_legacy_page, _legacy_config, args.pages, data, os.path.join(tmp, "legacy.log"))
+        cpu, size = run(_current_page, _current_config, args.pages, data, os.path.join(tmp, "current.log"))
+
+    print(f"{'setup':<10} {'cpu ms/page':>12} {'log KB/page':>12}")
+    print(f"{'legacy':<10} {legacy_cpu / args.pages * 1000:>12.3f} {legacy_bytes / args.pages / 1024:>12.2f}")
+    print(f"{'current':<10} {cpu / args.pages * 1000:>12.3f} {size / args.pages / 1024:>12.2f}")
+    print(f"request-thread CPU {cpu / legacy_cpu:.1%} of legacy, log volume {size / max(legacy_bytes, 1):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+End-to-end benchmark of the resume → jobs pipeline, fully offline.
+
+Runs each stage against synthetic fixtures and the local stub servers in
+benchmarks/stubs.py (no DeepSeek or Adzuna traffic):
+
+  process_resume_file            PDF → text → DeepSeek (stub), cache bypassed
+  fetch_jobs_from_adzuna         all pages for one role (stub), cache bypassed
+  extract_required_experience    per description
+  rank_jobs_by_similarity:cold   empty embedding store, every job encoded
+  rank_jobs_by_similarity:warm   all job vectors already stored
+
+and reports p50/p95 latency, throughput and peak traced memory per stage
+and scale. Peak memory comes from one extra tracemalloc run per stage
+(Python and numpy allocations; torch's own buffers are not traced).
+Results are written as JSON; --compare prints p50 changes against an
+earlier file.
+
+    python -m benchmarks.bench_pipeline --scales 100,1000,10000 --out bench.json
+    python -m benchmarks.bench_pipeline --compare bench.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+
+import app.utils as utils
+from app.cache import make_cache
+from app.embeddings import EmbeddingStore, EMBEDDING_VERSION
+from app.filters import extract_required_experience
+from benchmarks.fixtures import synthetic_jobs, synthetic_resume_pdf, SYNTHETIC_ANALYSIS
+from benchmarks.stubs import StubServers
+
+
+def _summary(seconds, items):
+    seconds = np.asarray(seconds)
+    p50 = float(np.percentile(seconds, 50))
+    return {
+        "runs"            : len(seconds),
+        "items"           : items,
+        "p50_ms"          : round(p50 * 1000, 3),
+        "p95_ms"          : round(float(np.percentile(seconds, 95)) * 1000, 3),
+        "mean_ms"         : round(float(seconds.mean()) * 1000, 3),
+        "throughput_per_s": round(items / p50, 1) if p50 else None,
+    }
+
+
+def _peak_mb(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / (1024 * 1024), 2)
+
+
+def measure(fn, items, repeat, setup=None):
+    """Time `repeat` calls of fn (setup before each, untimed), then one traced call for memory."""
+    seconds = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - started)
+    if setup:
+        setup()
+    return {**_summary(seconds, items), "peak_mem_mb": _peak_mb(fn)}
+
+
+def measure_per_item(fn, inputs):
+    """Latency of fn on each input separately (for cheap per-job functions)."""
+    seconds = []
+    for value in inputs:
+        started = time.perf_counter()
+        fn(value)
+        seconds.append(time.perf_counter() - started)
+    result = _summary(seconds, 1)
+    result["throughput_per_s"] = round(len(inputs) / sum(seconds), 1)
+    result["peak_mem_mb"] = _peak_mb(lambda: [fn(value) for value in inputs])
+    return result
+
+
+def run(scales, repeat, adzuna_latency, deepseek_latency, tmp):
+    results = {}
+    stubs = StubServers([], adzuna_latency=adzuna_latency, deepseek_latency=deepseek_latency).start()
+    utils.ADZUNA_API_URL = stubs.adzuna_url
+    utils.API_URL = stubs.deepseek_url
+    # keep the real instance/ caches out of it
+    utils.resume_analysis_cache = make_cache("resume_analyses", backend="memory")
+    utils.adzuna_cache = make_cache("adzuna_pages", backend="memory")
+
+    try:
+        # — resume upload: a fresh PDF each run, so the analysis cache never hits
+        pdfs = iter(synthetic_resume_pdf(pages=2, seed=seed) for seed in range(10 ** 6))
+        calls = stubs.calls["deepseek"]
+        results["process_resume_file"] = {
+            "-": measure(lambda: utils.process_resume_file(next(pdfs)), 1, repeat)
+        }
+        assert stubs.calls["deepseek"] > calls, "DeepSeek stub was not called"
+
+        resume = SYNTHETIC_ANALYSIS
+        resume_embedding = utils.embed_resume(resume["skills"], resume["projects"], resume["experience"])
+
+        for scale in scales:
+            jobs = synthetic_jobs(scale, seed=scale)
+            stubs.jobs = jobs
+            descriptions = [job["description"] for job in jobs]
+
+            def fetch():
+                fetched = utils.fetch_jobs_from_adzuna("Python Developer", "gb", "London", False, max_results=scale)
+                assert len(fetched) == scale, f"fetched {len(fetched)} of {scale}"
+
+            def rank():
+                utils.rank_jobs_by_similarity(
+                    resume["skills"], resume["projects"], resume["experience"],
+                    jobs, top_k=100, resume_embedding=resume_embedding
+                )
+
+            cold_stores = iter(range(10 ** 6))
+
+            def cold_store():
+                path = os.path.join(tmp, f"cold-{scale}-{next(cold_stores)}.db")
+                utils.job_embedding_store = EmbeddingStore(path, model_name=EMBEDDING_VERSION)
+
+            results.setdefault("fetch_jobs_from_adzuna", {})[str(scale)] = measure(
+                fetch, scale, repeat, setup=utils.adzuna_cache.clear
+            )
+            results.setdefault("extract_required_experience", {})[str(scale)] = measure_per_item(
+                extract_required_experience, descriptions
+            )
+            results.setdefault("rank_jobs_by_similarity:cold", {})[str(scale)] = measure(
+                rank, scale, repeat, setup=cold_store
+            )
+            # the last cold run left every vector in the store
+            results.setdefault("rank_jobs_by_similarity:warm", {})[str(scale)] = measure(
+                rank, scale, repeat
+            )
+            print(f"scale {scale} done")
+    finally:
+        stubs.stop()
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, baseline=None):
+    print(f"{'stage':<32} {'scale':>6} {'p50 ms':>10} {'p95 ms':>10} {'items/s':>10} {'peak MB':>8}")
+    for stage, by_scale in results.items():
+        for scale, r in by_scale.items():
+            line = (
+                f"{stage:<32} {scale:>6} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} "
+                f"{r['throughput_per_s'] or 0:>10.1f} {r['peak_mem_mb']:>8.2f}"
+            )
+            old = (baseline or {}).get(stage, {}).get(scale)
+            if old and old["p50_ms"]:
+                line += f"  p50 {(r['p50_ms'] / old['p50_ms'] - 1) * 100:+.1f}%"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", default="100,1000,10000", help="comma-separated job counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--adzuna-latency-ms", type=float, default=50)
+    parser.add_argument("--deepseek-latency-ms", type=float, default=200)
+    parser.add_argument("--out", default="bench_pipeline.json")
+    parser.add_argument("--compare", help="earlier results JSON to compare p50 against")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)  # the pipeline logs every page and request
+    scales = [int(s) for s in args.scales.split(",") if s]
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run(scales, args.repeat, args.adzuna_latency_ms / 1000, args.deepseek_latency_ms / 1000, tmp)
+
+    report = {
+        "meta": {
+            "created_at"       : datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit"           : _git_commit(),
+            "python"           : platform.python_version(),
+            "platform"         : platform.platform(),
+            "embedding_version": EMBEDDING_VERSION,
+            "repeat"           : args.repeat,
+            "stub_latency_ms"  : {"adzuna": args.adzuna_latency_ms, "deepseek": args.deepseek_latency_ms},
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print_table(results, baseline)
+    print(f"saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
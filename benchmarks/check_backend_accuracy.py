@@ -0,0 +1,75 @@
+"""
+Accuracy gate for an embedding backend: does its ranking match fp32 torch?
+
+Encodes the same jobs and resumes with the reference "torch" backend and
+the candidate, and for every resume compares the top-k job sets. Exits
+with status 1 if the lowest top-k overlap is below --threshold, so it can
+gate a deploy that switches EMBEDDING_BACKEND.
+
+    python -m benchmarks.check_backend_accuracy --backend onnx --threshold 0.9
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+from app.embeddings import load_model, encode_texts, EMBEDDING_BACKENDS
+from app.utils import job_text, build_resume_text
+from benchmarks.fixtures import synthetic_jobs
+
+RESUMES = [
+    build_resume_text("python, django, flask, sql, docker, aws", ["Job matching web app"], ["3 years backend development"]),
+    build_resume_text("java, spring boot, kafka, microservices", ["Payments platform"], ["5 years at a fintech"]),
+    build_resume_text("react, typescript, css, node.js", ["Design system"], ["2 years frontend engineer"]),
+    build_resume_text("pytorch, nlp, transformers, mlops", ["Resume parser"], ["4 years machine learning"]),
+    build_resume_text("kubernetes, terraform, ci/cd, linux", ["Cluster autoscaler"], ["6 years devops"]),
+]
+
+
+def _timed_encode(model, texts):
+    started = time.perf_counter()
+    vectors = encode_texts(texts, model=model)
+    return vectors, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", default=os.environ.get("EMBEDDING_BACKEND", "torch-int8"),
+                        choices=EMBEDDING_BACKENDS)
+    parser.add_argument("--threshold", type=float,
+                        default=float(os.environ.get("EMBEDDING_BACKEND_MIN_OVERLAP", 0.9)),
+                        help="minimum top-k overlap with the fp32 ranking (0-1)")
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--top-k", type=int, default=100)
+    args = parser.parse_args()
+
+    texts = [job_text(job) for job in synthetic_jobs(args.jobs, description_sentences=6)]
+    reference = load_model("torch")
+    candidate = load_model(args.backend)
+
+    ref_jobs, ref_t = _timed_encode(reference, texts)
+    cand_jobs, cand_t = _timed_encode(candidate, texts)
+    ref_resumes = encode_texts(RESUMES, model=reference)
+    cand_resumes = encode_texts(RESUMES, model=candidate)
+
+    overlaps = []
+    for ref_resume, cand_resume in zip(ref_resumes, cand_resumes):
+        ref_top = set(np.argsort(-(ref_jobs @ ref_resume))[:args.top_k])
+        cand_top = set(np.argsort(-(cand_jobs @ cand_resume))[:args.top_k])
+        overlaps.append(len(ref_top & cand_top) / args.top_k)
+
+    cosine = float(np.mean(np.sum(ref_jobs * cand_jobs, axis=1)))
+    print(f"torch       {len(texts) / ref_t:8.1f} jobs/s")
+    print(f"{args.backend:<11} {len(texts) / cand_t:8.1f} jobs/s  ({ref_t / cand_t:.2f}x)")
+    print(f"top-{args.top_k} overlap min {min(overlaps):.3f} mean {np.mean(overlaps):.3f}  "
+          f"mean vector cosine {cosine:.4f}")
+
+    if min(overlaps) < args.threshold:
+        print(f"FAIL: overlap below threshold {args.threshold}")
+        sys.exit(1)
+    print(f"OK: overlap at or above threshold {args.threshold}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Recall and latency of the IVF job index against exact (flat) search.
+
+By default builds a throwaway index of synthetic clustered vectors; pass
+--index to evaluate (and train IVF centroids for) an existing index such
+as instance/job_index.db. Queries are stored vectors plus noise, so they
+resemble a resume that sits near a group of jobs.
+
+    python -m benchmarks.eval_index_recall --jobs 50000 --queries 200
+    python -m benchmarks.eval_index_recall --index instance/job_index.db
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+
+from app.vector_index import JobIndex
+from benchmarks.fixtures import synthetic_jobs
+
+
+def _clustered_vectors(n, dim, clusters, seed):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _build_synthetic(path, n, dim, seed):
+    index = JobIndex(path)
+    jobs = synthetic_jobs(n, seed=seed, description_sentences=1)
+    vectors = _clustered_vectors(n, dim, clusters=max(8, n // 500), seed=seed)
+    for start in range(0, n, 5000):
+        chunk = slice(start, start + 5000)
+        index.add(jobs[chunk], vectors[chunk], [str(i) for i in range(start, start + len(jobs[chunk]))], "gb")
+    return index
+
+
+def _timed_search(index, queries, k, **kw):
+    results, elapsed = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append({job_id for job_id, _ in index.search(query, k=k, **kw)})
+        elapsed.append(time.perf_counter() - started)
+    return results, np.array(elapsed) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--index", help="existing index database (default: synthetic)")
+    parser.add_argument("--jobs", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=100)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--city", default=None, help="also filter by this city")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.index:
+            index = JobIndex(args.index)
+        else:
+            started = time.perf_counter()
+            index = _build_synthetic(os.path.join(tmp, "job_index.db"), args.jobs, args.dim, args.seed)
+            print(f"built synthetic index of {args.jobs} jobs in {time.perf_counter() - started:.1f}s")
+
+        index.refresh()
+        if len(index) == 0:
+            print("index is empty")
+            return
+
+        started = time.perf_counter()
+        index.build_ivf(nlist=args.nlist, seed=args.seed)
+        print(f"trained {len(index._centroids)} IVF lists in {time.perf_counter() - started:.1f}s")
+
+        rng = np.random.default_rng(args.seed + 1)
+        sample = index._vectors[rng.integers(0, len(index), args.queries)]
+        queries = sample + 0.3 * rng.standard_normal(sample.shape).astype(np.float32) / np.sqrt(sample.shape[1])
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        exact, flat_ms = _timed_search(index, queries, args.k, city=args.city)
+        print(f"flat      recall 1.000  p50 {np.percentile(flat_ms, 50):6.2f}ms  p95 {np.percentile(flat_ms, 95):6.2f}ms")
+
+        for nprobe in (1, 2, 4, 8, 16, 32):
+            if nprobe > len(index._centroids):
+                break
+            approx, ivf_ms = _timed_search(index, queries, args.k, city=args.city, mode="ivf", nprobe=nprobe)
+            recall = np.mean([len(a & e) / len(e) for a, e in zip(approx, exact) if e])
+            print(
+                f"ivf np={nprobe:<3} recall {recall:.3f}  "
+                f"p50 {np.percentile(ivf_ms, 50):6.2f}ms  p95 {np.percentile(ivf_ms, 95):6.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Synthetic Adzuna-shaped job fixtures for the benchmark scripts.
+"""
+import random
+
+_TITLES = [
+    "Python Developer", "Senior Python Developer", "Junior Data Analyst",
+    "Machine Learning Engineer", "Lead Backend Engineer", "Graduate Software Engineer",
+    "DevOps Engineer", "Cloud Engineer", "Sr. Java Developer", "React Developer",
+    "Associate Data Scientist", "Principal AI Engineer", "Intern - Web Development",
+]
+_COMPANIES = ["Acme Ltd", "Globex", "Initech", "Hooli", "Umbrella Recruitment", "Stark Talent"]
+_CITIES = ["London", "Manchester", "Bristol", "Leeds", "Remote"]
+_REQUIREMENTS = [
+    "3+ years of experience with Python and Django.",
+    "2-5 yrs experience building REST APIs.",
+    "At least three years working with AWS.",
+    "No experience required, training provided.",
+    "Relevant experience is a plus.",
+    "Minimum 7 years in a senior engineering role.",
+    "You will learn from a friendly team.",
+    "Fresher candidates welcome to apply.",
+    "",
+]
+_FILLER = (
+    "We are looking for a motivated engineer to join our growing team. "
+    "You will design, build and maintain services used by thousands of customers, "
+    "collaborate with product and data teams, and take ownership of features end to end. "
+    "Our stack includes Python, SQL, Docker, Kubernetes, React and cloud services. "
+)
+
+
+def synthetic_jobs(n, seed=0, description_sentences=4):
+    """n job dicts with id, title, company, location, description and salary fields."""
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(n):
+        title = rng.choice(_TITLES)
+        description = " ".join([
+            _FILLER * rng.randint(1, description_sentences),
+            rng.choice(_REQUIREMENTS),
+            rng.choice(_REQUIREMENTS),
+        ])
+        jobs.append({
+            "id": str(4000000000 + i),
+            "title": title,
+            "company": {"display_name": rng.choice(_COMPANIES)},
+            "location": {"display_name": rng.choice(_CITIES), "area": ["UK", rng.choice(_CITIES)]},
+            "description": description,
+            "salary_min": rng.randint(25, 60) * 1000,
+            "salary_max": rng.randint(60, 120) * 1000,
+            "redirect_url": f"https://www.adzuna.co.uk/jobs/details/{4000000000 + i}",
+        })
+    return jobs
+
+
+_RESUME_LINES = [
+    "Backend engineer with 3 years of experience building Python and Django services.",
+    "Designed REST APIs serving 2 million requests a day on AWS with PostgreSQL and Redis.",
+    "Built a job recommendation prototype with sentence embeddings and Flask.",
+    "Set up CI/CD pipelines with Docker, GitHub Actions and Kubernetes.",
+    "Mentored two interns and led code reviews for a team of six.",
+]
+
+# What the DeepSeek stub answers for every resume
+SYNTHETIC_ANALYSIS = {
+    "skills": "python, django, flask, postgresql, redis, aws, docker, kubernetes",
+    "projects": ["Job recommendation prototype with sentence embeddings"],
+    "experience": ["3 years backend engineering at a SaaS company"],
+    "experience_years": 3.0,
+    "suggested_roles": ["Python Developer", "Backend Engineer", "Django Developer"],
+}
+
+
+def synthetic_resume_pdf(pages=2, seed=0) -> bytes:
+    """A text PDF resume; different seeds give different bytes and text."""
+    import fitz
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for page_no in range(pages):
+        page = doc.new_page()
+        lines = [f"Candidate {seed} - page {page_no + 1}"] + [rng.choice(_RESUME_LINES) for _ in range(30)]
+        page.insert_text((72, 72), "\n".join(lines), fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
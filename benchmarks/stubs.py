@@ -0,0 +1,99 @@
+"""
+Local stand-ins for the Adzuna and DeepSeek APIs, for offline benchmarks.
+
+    stubs = StubServers(jobs, adzuna_latency=0.05, deepseek_latency=0.2).start()
+    utils.ADZUNA_API_URL = stubs.adzuna_url
+    utils.API_URL = stubs.deepseek_url
+
+Adzuna: GET /<country>/search/<page> pages through `jobs` using the
+results_per_page parameter and reports the total as "count". Requests
+are recorded in `requests` as (what, page, app_key); an app_key listed in
+`key_errors` gets that (status, headers) answer instead of results.
+DeepSeek: POST /v1/chat/completions answers every resume with
+fixtures.SYNTHETIC_ANALYSIS. Both sleep for their configured latency to
+stand in for the network round trip.
+"""
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks.fixtures import SYNTHETIC_ANALYSIS
+
+
+class StubServers:
+    def __init__(self, jobs, adzuna_latency=0.05, deepseek_latency=0.2):
+        self.jobs = jobs
+        self.adzuna_latency = adzuna_latency
+        self.deepseek_latency = deepseek_latency
+        self.calls = {"adzuna": 0, "deepseek": 0}
+        self.requests = []
+        self.key_errors = {}   # app_key → (status, headers)
+        self._lock = threading.Lock()
+        self._server = None
+
+    def start(self):
+        stubs = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, payload, status=200, headers=None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                page = int(url.path.rsplit("/", 1)[1])
+                per_page = int(query.get("results_per_page", ["20"])[0])
+                app_key = query.get("app_key", [None])[0]
+                stubs._count("adzuna", (query.get("what", [None])[0], page, app_key))
+                time.sleep(stubs.adzuna_latency)
+                if app_key in stubs.key_errors:
+                    status, headers = stubs.key_errors[app_key]
+                    self._send({"exception": "stubbed error"}, status, headers)
+                    return
+                start = (page - 1) * per_page
+                self._send({"count": len(stubs.jobs), "results": stubs.jobs[start:start + per_page]})
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stubs._count("deepseek")
+                time.sleep(stubs.deepseek_latency)
+                self._send({"choices": [{"message": {"content": json.dumps(SYNTHETIC_ANALYSIS)}}]})
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def _count(self, api, request=None):
+        with self._lock:
+            self.calls[api] += 1
+            if request:
+                self.requests.append(request)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    @property
+    def adzuna_url(self):
+        return self.base_url
+
+    @property
+    def deepseek_url(self):
+        return f"{self.base_url}/v1/chat/completions"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
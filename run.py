@@ -1,6 +1,10 @@
 from app import create_app
 
-app = create_app()
+# Module-level app for `gunicorn run:app` / `flask --app run`, except in
+# filter pool workers: the spawn pool (see app/filters.py) re-imports the
+# main script in each of them under the name __mp_main__
+if __name__ != "__mp_main__":
+    app = create_app()
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,42 @@
+import pytest
+
+from app import create_app, logging_config, utils
+from app.key_pool import KeyPool
+from app.models import db
+from benchmarks.stubs import StubServers
+
+ADZUNA_TEST_KEYS = [
+    {"app_id": "id1", "app_key": "key1"},
+    {"app_id": "id2", "app_key": "key2"},
+]
+
+# before create_app does it: no app.log in the working tree
+logging_config.configure_logging(log_file=None, console=False)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+    })
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def stubs():
+    servers = StubServers([], adzuna_latency=0, deepseek_latency=0).start()
+    yield servers
+    servers.stop()
+
+
+@pytest.fixture
+def adzuna(stubs, monkeypatch):
+    """The Adzuna stub behind fetch_adzuna_page, with two fresh keys and an empty page cache."""
+    monkeypatch.setattr(utils, "ADZUNA_API_URL", stubs.adzuna_url)
+    monkeypatch.setattr(utils, "adzuna_key_pool", KeyPool("adzuna", ADZUNA_TEST_KEYS, max_wait=0.5))
+    utils.adzuna_cache.clear()
+    yield stubs
+    utils.adzuna_cache.clear()
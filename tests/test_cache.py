@@ -0,0 +1,128 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app import cache
+from app.cache import MISSING, MemoryCache, SQLiteCache, make_cache, make_key
+from app.utils import fetch_jobs_from_adzuna, ADZUNA_PAGE_SIZE
+from benchmarks.fixtures import synthetic_jobs
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    def build(maxsize=100, ttl=60):
+        if request.param == "memory":
+            return MemoryCache(maxsize=maxsize, ttl=ttl)
+        return SQLiteCache(str(tmp_path / "cache.db"), maxsize=maxsize, ttl=ttl)
+    return build
+
+
+def test_make_key_normalizes_query_parameters():
+    assert make_key(" Python  Developer", "GB", None, True, 1) == make_key("python developer", "gb", None, True, 1)
+    assert make_key("a", None) != make_key("a", "none")
+    assert make_key(True) != make_key("true")
+
+
+def test_values_round_trip_and_empty_values_are_hits(backend):
+    store = backend()
+    store.set("k", [[{"id": "1"}], 10])
+    store.set("empty", [])
+
+    assert store.get("k") == [[{"id": "1"}], 10]
+    assert store.get("empty") == []
+    assert store.get("absent") is MISSING
+
+
+def test_entries_expire_after_ttl(backend, clock):
+    store = backend(ttl=60)
+    store.set("k", 1)
+
+    clock[0] += 59
+    assert store.get("k") == 1
+    clock[0] += 2
+    assert store.get("k") is MISSING
+
+
+def test_memory_cache_evicts_least_recently_read():
+    store = MemoryCache(maxsize=2)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.get("a")
+    store.set("c", 3)
+
+    assert store.get("b") is MISSING
+    assert store.get("a") == 1 and store.get("c") == 3
+
+
+def test_sqlite_cache_evicts_least_recently_read_every_n_writes(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(cache, "SQLITE_EVICT_EVERY", 5)
+    store = SQLiteCache(str(tmp_path / "cache.db"), maxsize=3)
+    for i in range(4):
+        clock[0] += cache.SQLITE_TOUCH_INTERVAL
+        store.set(str(i), i)
+    clock[0] += cache.SQLITE_TOUCH_INTERVAL
+    store.get("0")  # now the most recently read
+
+    assert len(store) == 4  # over maxsize until the 5th write checks
+    clock[0] += cache.SQLITE_TOUCH_INTERVAL
+    store.set("4", 4)
+
+    assert len(store) == 3
+    assert store.get("1") is MISSING and store.get("2") is MISSING
+    assert store.get("3") == 3 and store.get("4") == 4
+
+
+def test_sqlite_writes_below_capacity_do_not_delete(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "SQLITE_EVICT_EVERY", 1)
+    store = SQLiteCache(str(tmp_path / "cache.db"), maxsize=100)
+    conn = store._conn()
+    store.set("a", 1)
+
+    before = conn.total_changes
+    store.set("b", 2)
+    assert conn.total_changes - before == 1  # the insert only
+
+
+def test_sqlite_hits_are_read_only(tmp_path):
+    store = SQLiteCache(str(tmp_path / "cache.db"))
+    store.set("k", 1)
+    conn = store._conn()
+
+    before = conn.total_changes
+    for _ in range(100):
+        assert store.get("k") == 1
+    assert conn.total_changes == before
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteCache(path).set("k", {"shared": True})
+    assert SQLiteCache(path).get("k") == {"shared": True}
+
+
+def test_result_cache_counts_hits_and_misses(tmp_path):
+    results = make_cache("pages", backend="sqlite", path=str(tmp_path / "cache.db"))
+    results.set("k", 1)
+    results.get("k")
+    results.get("other")
+
+    assert results.stats() == {"backend": "SQLiteCache", "size": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+    with pytest.raises(ValueError):
+        make_cache("pages", backend="redis")
+
+
+def test_adzuna_pages_are_cached(adzuna):
+    adzuna.jobs = synthetic_jobs(ADZUNA_PAGE_SIZE)
+
+    first = fetch_jobs_from_adzuna("Python Developer", "GB", max_results=ADZUNA_PAGE_SIZE)
+    second = fetch_jobs_from_adzuna(" python developer", "gb", max_results=ADZUNA_PAGE_SIZE)
+
+    assert first == second == adzuna.jobs
+    assert adzuna.calls["adzuna"] == 1
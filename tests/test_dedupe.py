@@ -0,0 +1,49 @@
+from app.dedupe import NearDuplicateIndex, collapse_near_duplicates, lsh_bands, MINHASH_PERMUTATIONS
+
+DESCRIPTION = (
+    "We are hiring a backend engineer to design and run the Python services behind our "
+    "marketplace, working with PostgreSQL, Redis and Kubernetes alongside a small product team."
+)
+
+
+def _job(job_id, title="Python Developer", company="Acme Ltd", description=DESCRIPTION):
+    return {"id": job_id, "title": title, "company": {"display_name": company}, "description": description}
+
+
+def test_relisted_posting_collapses_to_the_first():
+    jobs = [
+        _job("1"),
+        _job("2", title="Data Analyst", description="Analyse sales data in Excel and build weekly dashboards."),
+        _job("3", description=DESCRIPTION + " Apply now!"),
+        _job("4", title="python developer", description=DESCRIPTION.upper()),
+    ]
+    assert [job["id"] for job in collapse_near_duplicates(jobs)] == ["1", "2"]
+
+
+def test_different_postings_are_kept_in_order():
+    jobs = [
+        _job(str(i), title=f"Engineer {i}", description=f"Team {i} builds product {i} using tool {i} daily.")
+        for i in range(50)
+    ]
+    assert collapse_near_duplicates(jobs) == jobs
+
+
+def test_threshold_above_one_disables_collapsing():
+    jobs = [_job("1"), _job("2")]
+    assert collapse_near_duplicates(jobs, threshold=1.1) == jobs
+    assert collapse_near_duplicates(jobs, threshold=0.8) == jobs[:1]
+
+
+def test_index_matches_batch_collapse():
+    jobs = [_job("1"), _job("2", company="Globex", description="Unrelated warehouse role with shifts."), _job("3")]
+    index = NearDuplicateIndex()
+    assert [index.add(job) for job in jobs] == [True, True, False]
+    assert index.kept == collapse_near_duplicates(jobs)
+    assert len(index) == 2
+
+
+def test_lsh_bands_cover_all_permutations():
+    for threshold in (0.5, 0.8, 0.9):
+        bands, rows = lsh_bands(threshold)
+        assert bands * rows == MINHASH_PERMUTATIONS
+        assert (1 / bands) ** (1 / rows) <= threshold
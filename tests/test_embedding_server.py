@@ -0,0 +1,72 @@
+import os
+import socket
+import stat
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app import embedding_server
+from app.embedding_server import EmbeddingClient, EmbeddingServer
+
+SECRET = b"test-secret"
+
+
+def _fake_encode(texts, model=None):
+    return np.array([[len(t), 1.0, 0.0] for t in texts], dtype=np.float32)
+
+
+def _wait_for(path):
+    deadline = time.monotonic() + 5
+    while not os.path.exists(path):
+        assert time.monotonic() < deadline, "server did not start"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_server, "get_model", lambda: None)
+    monkeypatch.setattr(embedding_server, "encode_texts", _fake_encode)
+    address = str(tmp_path / "embeddings.sock")
+    server = EmbeddingServer(address, authkey=SECRET)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _wait_for(address)
+    return server
+
+
+def test_vectors_round_trip(server):
+    client = EmbeddingClient(server.address, authkey=SECRET)
+
+    vectors = client.encode(["a", "abc", ""])
+
+    assert vectors.dtype == np.float32
+    np.testing.assert_array_equal(vectors[:, 0], [1, 3, 0])
+    assert client.stats()["texts"] == 3
+
+
+def test_socket_is_private_to_its_user(server):
+    assert stat.S_IMODE(os.stat(server.address).st_mode) == 0o600
+
+
+def test_wrong_secret_is_rejected(server):
+    with pytest.raises((EOFError, OSError)):
+        EmbeddingClient(server.address, authkey=b"wrong").encode(["a"])
+
+
+def test_secret_is_required():
+    with pytest.raises(ValueError):
+        EmbeddingServer("unused.sock", authkey=None)
+    with pytest.raises(ValueError):
+        EmbeddingClient("unused.sock", authkey=b"")
+
+
+def test_unresponsive_server_times_out(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_server, "CLIENT_TIMEOUTS", (0.2, 0.2))
+    with socket.create_server(("127.0.0.1", 0)) as silent:  # accepts, never answers
+        client = EmbeddingClient(f"127.0.0.1:{silent.getsockname()[1]}", authkey=SECRET)
+
+        started = time.monotonic()
+        with pytest.raises(OSError):
+            client.encode(["a"])
+        assert time.monotonic() - started < 2
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from app.embeddings import EmbeddingStore, text_hash
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EmbeddingStore(str(tmp_path / "embeddings.db"), model_name="model@test")
+
+
+def _vector(seed, dim=8):
+    vector = np.random.default_rng(seed).random(dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_vectors_round_trip_by_job_id_and_text_hash(store):
+    key = ("1", text_hash("Python Developer"))
+    store.put_many([(key, _vector(1))])
+
+    found = store.get_many([key, ("1", text_hash("edited description")), ("2", key[1])])
+
+    assert list(found) == [key]
+    assert found[key].dtype == np.float32
+    np.testing.assert_allclose(found[key], _vector(1), atol=1e-3)
+    assert store.stats() == {"hits": 1, "misses": 2, "hit_rate": 0.3333}
+
+
+def test_vectors_are_kept_per_model(store, tmp_path):
+    key = ("1", text_hash("text"))
+    store.put_many([(key, _vector(1))])
+
+    other = EmbeddingStore(store.path, model_name="model@other")
+    assert other.get_many([key]) == {}
+
+
+def test_failed_write_is_rolled_back(store):
+    conn = store._conn()
+    conn.execute(
+        "CREATE TRIGGER reject_bad BEFORE INSERT ON job_embeddings WHEN NEW.job_id = 'bad'"
+        " BEGIN SELECT RAISE(ABORT, 'bad row'); END"
+    )
+    good = ("good", text_hash("good"))
+
+    with pytest.raises(Exception, match="bad row"):
+        store.put_many([(good, _vector(1)), (("bad", text_hash("bad")), _vector(2))])
+
+    assert not conn.in_transaction
+    assert store.get_many([good]) == {}
+    # the same thread's connection still takes writes
+    store.put_many([(good, _vector(1))])
+    assert list(store.get_many([good])) == [good]
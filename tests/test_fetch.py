@@ -0,0 +1,64 @@
+from app.utils import fetch_jobs_for_roles, fetch_jobs_from_adzuna, ADZUNA_PAGE_SIZE
+from benchmarks.fixtures import synthetic_jobs
+
+
+def _pages(stubs, role):
+    return sorted(page for what, page, _ in stubs.requests if what == role)
+
+
+def test_max_results_caps_pages_and_jobs(adzuna):
+    adzuna.jobs = synthetic_jobs(5 * ADZUNA_PAGE_SIZE)
+
+    jobs = fetch_jobs_for_roles(["Python Developer"], "GB", max_results=ADZUNA_PAGE_SIZE + 10)
+
+    assert jobs == adzuna.jobs[:ADZUNA_PAGE_SIZE + 10]
+    assert _pages(adzuna, "Python Developer") == [1, 2]
+
+
+def test_results_are_merged_role_by_role_page_by_page(adzuna):
+    adzuna.jobs = synthetic_jobs(4 * ADZUNA_PAGE_SIZE)
+    roles = ["Python Developer", "Data Engineer", "ML Engineer"]
+
+    jobs = fetch_jobs_for_roles(roles, "GB", max_results=3 * ADZUNA_PAGE_SIZE, max_workers=4)
+
+    # the stub answers every role with the same listing
+    assert jobs == adzuna.jobs[:3 * ADZUNA_PAGE_SIZE] * len(roles)
+    for role in roles:
+        assert _pages(adzuna, role) == [1, 2, 3]
+    assert fetch_jobs_from_adzuna(roles[0], "GB", max_results=3 * ADZUNA_PAGE_SIZE) == adzuna.jobs[:3 * ADZUNA_PAGE_SIZE]
+
+
+def test_on_page_reports_progress(adzuna):
+    adzuna.jobs = synthetic_jobs(2 * ADZUNA_PAGE_SIZE)
+    progress = []
+
+    fetch_jobs_for_roles(["Python Developer"], "GB", max_results=4 * ADZUNA_PAGE_SIZE,
+                         on_page=lambda pages, jobs: progress.append((pages, jobs)))
+
+    assert progress == [(1, ADZUNA_PAGE_SIZE), (2, 2 * ADZUNA_PAGE_SIZE)]
+
+
+def test_pages_past_count_are_not_requested(adzuna):
+    adzuna.jobs = synthetic_jobs(2 * ADZUNA_PAGE_SIZE + 20)
+
+    jobs = fetch_jobs_for_roles(["Python Developer"], "GB", max_results=10 * ADZUNA_PAGE_SIZE)
+
+    assert jobs == adzuna.jobs
+    assert _pages(adzuna, "Python Developer") == [1, 2, 3]
+
+
+def test_enough_stops_every_role(adzuna):
+    adzuna.jobs = synthetic_jobs(5 * ADZUNA_PAGE_SIZE)
+    windows = []
+
+    def enough(window_jobs):
+        windows.append(len(window_jobs))
+        return True
+
+    jobs = fetch_jobs_for_roles(["Python Developer", "Data Engineer"], "GB",
+                                max_results=5 * ADZUNA_PAGE_SIZE, enough=enough)
+
+    # first window: page 1 of each role, which also reports the count
+    assert windows == [2 * ADZUNA_PAGE_SIZE]
+    assert len(adzuna.requests) == 2
+    assert jobs == adzuna.jobs[:ADZUNA_PAGE_SIZE] * 2
@@ -0,0 +1,46 @@
+import os
+import runpy
+
+import pytest
+
+from app.filters import filter_jobs, classify_jobs, extract_required_experience
+from benchmarks.fixtures import synthetic_jobs
+
+
+@pytest.mark.parametrize("text, years", [
+    ("3+ years of experience with Python", 3),
+    ("2-5 yrs experience building REST APIs", 2),
+    ("At least three years working with AWS", 3),
+    ("You will learn from a friendly team", 0),
+])
+def test_extract_required_experience(text, years):
+    assert extract_required_experience(text) == years
+
+
+def test_seniority_follows_candidate_experience():
+    jobs = [
+        {"title": "Senior Python Developer", "description": "Build services."},
+        {"title": "Junior Python Developer", "description": "Build services."},
+        {"title": "Python Developer", "description": "5+ years of experience required."},
+    ]
+    assert [job["title"] for job in filter_jobs(jobs, 1)] == ["Junior Python Developer"]
+    assert [job["title"] for job in filter_jobs(jobs, 6)] == ["Senior Python Developer", "Python Developer"]
+
+
+def test_parallel_classification_matches_serial():
+    jobs = synthetic_jobs(400, seed=7)
+    assert classify_jobs(jobs, parallel=True) == classify_jobs(jobs, parallel=False)
+
+
+@pytest.mark.parametrize("candidate_exp", [0, 1, 3, 4, 8])
+def test_parallel_filter_matches_serial(candidate_exp):
+    jobs = synthetic_jobs(400, seed=7)
+    serial = filter_jobs(jobs, candidate_exp, parallel=False)
+    assert filter_jobs(jobs, candidate_exp, parallel=True) == serial
+    assert filter_jobs(jobs, candidate_exp) == serial
+
+
+def test_run_py_builds_the_app_except_in_pool_workers():
+    path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "run.py")
+    assert "app" in runpy.run_path(path, run_name="run")
+    assert "app" not in runpy.run_path(path, run_name="__mp_main__")
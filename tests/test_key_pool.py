@@ -0,0 +1,159 @@
+import time
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+
+from app import utils
+from app.key_pool import KeyPool, KEY_REJECTED_COOLDOWN, backoff_delay, retry_after_seconds
+from benchmarks.fixtures import synthetic_jobs
+
+
+def _response(status, **headers):
+    return SimpleNamespace(status_code=status, headers=headers)
+
+
+def _cooldowns(pool):
+    return [key["cooldown_s"] for key in pool.stats()["keys"]]
+
+
+def test_least_loaded_picks_the_idle_key():
+    pool = KeyPool("test", ["a", "b", "c"])
+    assert [pool.acquire() for _ in range(3)] == [0, 1, 2]
+
+    pool.release(1, _response(200))
+    assert pool.acquire() == 1
+
+
+def test_round_robin_cycles_through_keys():
+    pool = KeyPool("test", ["a", "b", "c"], strategy="round_robin")
+    picked = []
+    for _ in range(6):
+        i = pool.acquire()
+        picked.append(i)
+        pool.release(i, _response(200))
+    assert picked == [0, 1, 2, 0, 1, 2]
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        KeyPool("test", ["a"], strategy="random")
+
+
+def test_rate_limited_key_cools_down_for_retry_after():
+    pool = KeyPool("test", ["a", "b"])
+    assert pool.acquire() == 0
+    pool.release(0, _response(429, **{"Retry-After": "30"}))
+
+    assert 29 <= _cooldowns(pool)[0] <= 30
+    assert [pool.acquire(max_wait=0) for _ in range(2)] == [1, 1]
+
+
+def test_acquire_gives_up_when_every_key_cools_down():
+    pool = KeyPool("test", ["a"], max_wait=0.05)
+    pool.release(pool.acquire(), _response(429, **{"Retry-After": "30"}))
+
+    started = time.monotonic()
+    assert pool.acquire() is None
+    assert time.monotonic() - started < 1
+
+
+def test_acquire_waits_for_a_short_cooldown():
+    pool = KeyPool("test", ["a"], max_wait=2)
+    pool.release(pool.acquire(), _response(429, **{"Retry-After": "0.1"}))
+    assert pool.acquire() == 0
+
+
+def test_success_resets_backoff():
+    pool = KeyPool("test", ["a"])
+    pool.release(pool.acquire(), None)
+    assert pool._state[0].failures == 1
+    pool._state[0].cooldown_until = 0
+    pool.release(pool.acquire(), _response(200))
+    assert pool._state[0].failures == 0
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds(_response(429, **{"Retry-After": "12"})) == 12
+    assert retry_after_seconds(_response(429, **{"Retry-After": "-3"})) == 0
+    assert retry_after_seconds(_response(429)) is None
+    assert retry_after_seconds(_response(429, **{"Retry-After": "soon"})) is None
+    assert retry_after_seconds(None) is None
+
+    date = formatdate(time.time() + 60, usegmt=True)
+    assert 55 <= retry_after_seconds(_response(429, **{"Retry-After": date})) <= 60
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    for failures in range(1, 10):
+        delay = min(8.0, 2 ** (failures - 1))
+        assert delay / 2 <= backoff_delay(failures, base=1.0, cap=8.0) <= delay
+
+
+def test_fetch_moves_past_a_rate_limited_key(adzuna):
+    adzuna.jobs = synthetic_jobs(10)
+    adzuna.key_errors["key1"] = (429, {"Retry-After": "30"})
+
+    results, count = utils.fetch_adzuna_page("Python Developer", "gb", 1)
+
+    assert results == adzuna.jobs and count == 10
+    assert [key for _, _, key in adzuna.requests] == ["key1", "key2"]
+    cooldowns = _cooldowns(utils.adzuna_key_pool)
+    assert 29 <= cooldowns[0] <= 30 and cooldowns[1] == 0
+
+
+def test_fetch_parks_a_rejected_key(adzuna):
+    adzuna.jobs = synthetic_jobs(10)
+    adzuna.key_errors["key1"] = (401, {})
+
+    assert utils.fetch_adzuna_page("Python Developer", "gb", 1) is not None
+    assert _cooldowns(utils.adzuna_key_pool)[0] > KEY_REJECTED_COOLDOWN - 5
+
+    # later pages go straight to the working key
+    utils.fetch_adzuna_page("Python Developer", "gb", 2)
+    assert [key for _, _, key in adzuna.requests] == ["key1", "key2", "key2"]
+
+
+def test_fetch_fails_when_every_key_fails(adzuna):
+    adzuna.key_errors.update({"key1": (500, {}), "key2": (500, {})})
+
+    assert utils.fetch_adzuna_page("Python Developer", "gb", 1) is None
+    assert {key for _, _, key in adzuna.requests} == {"key1", "key2"}
+    assert all(state.failures for state in utils.adzuna_key_pool._state)
+
+
+@pytest.mark.parametrize("status", [402, 403])
+def test_unpaid_or_forbidden_key_is_parked(status):
+    pool = KeyPool("test", ["a", "b"])
+    pool.release(pool.acquire(), _response(status))
+
+    assert _cooldowns(pool)[0] > KEY_REJECTED_COOLDOWN - 5
+    assert pool.acquire(max_wait=0) == 1
+
+
+def test_other_client_errors_back_off():
+    pool = KeyPool("test", ["a", "b"])
+    pool.release(pool.acquire(), _response(400))
+
+    assert pool._state[0].failures == 1
+    assert 0 < _cooldowns(pool)[0] <= 1
+    assert pool.acquire(max_wait=0) == 1
+
+
+def test_deepseek_retries_sleep_a_capped_total_and_not_after_the_last_attempt(monkeypatch):
+    answer = SimpleNamespace(
+        status_code=200, headers={},
+        raise_for_status=lambda: None,
+        json=lambda: {"choices": [{"message": {"content": "not json"}}]},
+    )
+    sleeps = []
+    monkeypatch.setattr(utils.http_client, "post", lambda *args, **kwargs: answer)
+    monkeypatch.setattr(utils, "sleep", sleeps.append)
+    monkeypatch.setattr(utils, "deepseek_key_pool", KeyPool("deepseek", ["a", "b"]))
+    monkeypatch.setattr(utils, "RETRY_DELAY", 10)
+
+    assert utils._request_analysis("resume") is None
+
+    attempts = 2 * utils.MAX_RETRIES
+    assert len(sleeps) == attempts - 1
+    assert sum(sleeps) <= utils.RETRY_MAX_WAIT
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from app import utils
+from app.lexical import LexicalScorer, parse_skills
+
+JOBS = [
+    "Python developer building Django REST APIs on AWS",
+    "Java engineer working on Spring microservices",
+    "C++ and C# game developer",
+    "Data analyst with Excel and SQL reporting",
+    "Senior Python engineer: Django, PostgreSQL, Docker, AWS",
+]
+
+
+def test_parse_skills_normalizes_and_deduplicates():
+    assert parse_skills("Python, Django , C++, python,, ") == ["python", "django", "c++"]
+    assert parse_skills(None) == []
+
+
+def test_skill_matches_need_every_token_of_a_skill():
+    scorer = LexicalScorer(JOBS)
+
+    matches = scorer.skill_matches("python, django, c++, spring boot")
+
+    np.testing.assert_allclose(matches, [0.5, 0, 0.25, 0, 0.5])
+
+
+def test_bm25_ranks_jobs_sharing_rare_query_terms_first():
+    scorer = LexicalScorer(JOBS)
+
+    scores = scorer.bm25("Django Python developer")
+
+    assert set(np.argsort(-scores)[:2]) == {0, 4}
+    assert scores[1] == scores[3] == 0
+
+
+def test_score_is_in_unit_range_and_prefilter_keeps_job_order():
+    scorer = LexicalScorer(JOBS)
+
+    scores = scorer.score("python, django, aws", "Python Django AWS backend developer")
+
+    assert scores.min() >= 0 and scores.max() <= 1
+    assert list(scorer.top(scores, 2)) == [0, 4]
+    assert list(scorer.top(scores, 10)) == list(range(len(JOBS)))
+
+
+@pytest.mark.parametrize("texts", [[], ["", "  "]])
+def test_no_tokens_scores_zero(texts):
+    scorer = LexicalScorer(texts)
+    assert list(scorer.score("python", "python")) == [0] * len(texts)
+
+
+def test_hybrid_blend_of_embedding_and_lexical_scores(monkeypatch):
+    resume = np.array([1.0, 0.0], dtype=np.float32)
+    job_vectors = np.array([[0.9, 0.1], [0.8, 0.2], [0.1, 0.9]], dtype=np.float32)
+    monkeypatch.setattr(utils, "embed_job_texts", lambda jobs, texts: job_vectors)
+    jobs = [{"id": str(i), "title": "t", "description": "d"} for i in range(3)]
+    lexical = np.array([0.0, 1.0, 0.5], dtype=np.float32)
+
+    semantic_only = utils.rank_job_indices("", [], [], jobs, resume_embedding=resume)
+    monkeypatch.setattr(utils, "HYBRID_LEXICAL_WEIGHT", 0.3)
+    hybrid = utils.rank_job_indices("", [], [], jobs, resume_embedding=resume, lexical_scores=lexical)
+
+    assert [i for i, _ in semantic_only] == [0, 1, 2]
+    assert [i for i, _ in hybrid] == [1, 0, 2]
+    expected = 0.7 * (job_vectors @ resume) + 0.3 * lexical
+    assert [score for _, score in hybrid] == pytest.approx([expected[1], expected[0], expected[2]])
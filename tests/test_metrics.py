@@ -0,0 +1,91 @@
+import pytest
+
+from app import create_app
+from app.metrics import Registry, registry, timer, timed
+
+
+def test_counters_and_histograms_render_in_prometheus_format():
+    metrics = Registry()
+    requests = metrics.counter("requests_total", "Requests")
+    latency = metrics.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    requests.inc(status="200")
+    requests.inc(2, status="200")
+    requests.inc(status='5"0"0')
+    latency.observe(0.5)
+
+    lines = metrics.render().splitlines()
+
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{status="200"} 3' in lines
+    assert 'requests_total{status="5\\"0\\"0"} 1' in lines
+    assert "# TYPE latency_seconds histogram" in lines
+    assert 'latency_seconds_bucket{le="0.1"} 0' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 1' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 1' in lines
+    assert "latency_seconds_count 1" in lines
+
+
+def test_registry_returns_the_same_metric_for_a_name():
+    metrics = Registry()
+
+    assert metrics.counter("hits_total") is metrics.counter("hits_total")
+
+
+def _stage_count(stage):
+    prefix = f'stage_duration_seconds_count{{stage="{stage}"}} '
+    for line in registry.render().splitlines():
+        if line.startswith(prefix):
+            return int(line[len(prefix):])
+    return 0
+
+
+def test_timer_and_timed_observe_stage_durations():
+    before = _stage_count("test_stage")
+
+    with timer("test_stage"):
+        pass
+
+    @timed("test_stage")
+    def work():
+        return 42
+
+    assert work() == 42
+    assert _stage_count("test_stage") == before + 2
+
+
+@pytest.fixture
+def timed_app(tmp_path):
+    def build(server_timing):
+        app = create_app({
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+            "SERVER_TIMING": server_timing,
+        })
+
+        @app.route("/timed")
+        def timed_view():
+            with timer("test_view"):
+                return "ok"
+
+        return app.test_client()
+    return build
+
+
+def test_metrics_endpoint_serves_request_latencies(timed_app):
+    client = timed_app(False)
+    client.get("/timed")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert 'http_request_duration_seconds_count{endpoint="timed_view",method="GET",status="200"}' in response.text
+
+
+def test_server_timing_header_lists_stages_when_enabled(timed_app):
+    response = timed_app(True).get("/timed")
+
+    stages = [part.split(";")[0] for part in response.headers["Server-Timing"].split(", ")]
+    assert stages == ["test_view", "total"]
+
+    assert "Server-Timing" not in timed_app(False).get("/timed").headers
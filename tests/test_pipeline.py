@@ -0,0 +1,115 @@
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app import pipeline
+from app.job_store import JobStore
+from app.utils import ADZUNA_PAGE_SIZE
+
+
+def _jobs(n):
+    """Distinct postings; every other one is a senior role a new graduate is filtered out of."""
+    return [
+        {
+            "id": str(i),
+            "title": f"{'Senior ' if i % 2 else ''}Python Developer {i}",
+            "company": {"display_name": f"Company {i}"},
+            "description": f"Team {i} builds service {i} with tool {i} and framework {i} for client {i}.",
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def search(adzuna, monkeypatch):
+    rng = np.random.default_rng(0)
+    monkeypatch.setattr(pipeline, "_resume_embedding", lambda analysis: np.ones(4, dtype=np.float32) / 2)
+    monkeypatch.setattr(pipeline, "embed_job_texts", lambda jobs, texts: rng.random((len(jobs), 4)).astype(np.float32))
+    monkeypatch.setattr(pipeline, "index_jobs", lambda *args: None)
+
+    analysis = SimpleNamespace(
+        experience_years=0, suggested_roles=json.dumps(["Python Developer"]),
+        skills="python", projects="[]", experience="[]",
+    )
+    preferences = SimpleNamespace(country="GB", city=None, is_remote=False)
+    return lambda: pipeline.run_job_search(analysis, preferences)
+
+
+def test_fetching_stops_once_enough_jobs_pass_the_filter(search, adzuna, monkeypatch):
+    adzuna.jobs = _jobs(30 * ADZUNA_PAGE_SIZE)
+    monkeypatch.setattr(pipeline, "FETCH_TARGET_CANDIDATES", 6 * ADZUNA_PAGE_SIZE)
+
+    result = search()
+
+    # half of each page passes: page 1, then two windows of 8 pages, where
+    # counting raw postings would have stopped after the first window
+    assert result["valid_count"] >= 6 * ADZUNA_PAGE_SIZE
+    assert len(adzuna.requests) == 17
+    assert all(not job["title"].startswith("Senior") for job in result["jobs"])
+
+
+def test_zero_target_fetches_everything(search, adzuna, monkeypatch):
+    adzuna.jobs = _jobs(6 * ADZUNA_PAGE_SIZE)
+    monkeypatch.setattr(pipeline, "FETCH_TARGET_CANDIDATES", 0)
+
+    result = search()
+
+    assert len(adzuna.requests) == 6
+    assert result["valid_count"] == 3 * ADZUNA_PAGE_SIZE
+
+
+@pytest.fixture
+def stored(tmp_path, monkeypatch):
+    """save_job_results/load_job_results against a job store in tmp_path."""
+    monkeypatch.setattr(pipeline, "job_store", JobStore(str(tmp_path / "jobs.db")))
+    analysis = SimpleNamespace(
+        experience_years=1.0, suggested_roles='["Python Developer"]',
+        skills="python", projects="[]", experience="[]",
+    )
+    preferences = SimpleNamespace(country="GB", city=None, is_remote=False, job_results=None)
+    result = {
+        "jobs": [
+            {"id": "1", "title": "Python Developer", "match_score": 0.9},
+            {"id": "2", "title": "Backend Engineer", "match_score": 0.5},
+        ],
+        "query": ["GB", None, False],
+        "valid_count": 2,
+    }
+    pipeline.save_job_results(preferences, analysis, result)
+    return analysis, preferences
+
+
+def test_stored_results_round_trip(stored):
+    analysis, preferences = stored
+
+    loaded = pipeline.load_job_results(preferences, analysis)
+
+    assert [(job["id"], job["title"], job["match_score"]) for job in loaded["jobs"]] == [
+        ("1", "Python Developer", 0.9),
+        ("2", "Backend Engineer", 0.5),
+    ]
+    assert loaded["valid_count"] == 2
+    # only ids and scores live on the preference row
+    assert "Backend Engineer" not in preferences.job_results
+
+
+def test_stored_results_are_tied_to_analysis_content_and_query(stored):
+    analysis, preferences = stored
+
+    reanalysed = SimpleNamespace(**{**vars(analysis), "id": 99})
+    assert pipeline.load_job_results(preferences, reanalysed) is not None
+
+    changed = SimpleNamespace(**{**vars(analysis), "skills": "java"})
+    assert pipeline.load_job_results(preferences, changed) is None
+
+    preferences.country = "US"
+    assert pipeline.load_job_results(preferences, analysis) is None
+
+
+def test_missing_payload_invalidates_stored_results(stored, tmp_path, monkeypatch):
+    analysis, preferences = stored
+    monkeypatch.setattr(pipeline, "job_store", JobStore(str(tmp_path / "other.db")))
+
+    assert pipeline.load_job_results(preferences, analysis) is None
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from app.utils import top_k_scores
+
+
+@pytest.mark.parametrize("n, k", [(1000, 20), (50, 50), (10, 25), (5, 0), (0, 3)])
+def test_top_k_scores_matches_full_sort(n, k):
+    scores = np.random.default_rng(n).random(n).astype(np.float32)
+    expected = np.argsort(-scores, kind="stable")[:k]
+
+    top = top_k_scores(scores, k)
+
+    assert [i for i, _ in top] == [int(i) for i in expected]
+    assert [score for _, score in top] == [float(scores[i]) for i in expected]
+
+
+def test_top_k_scores_with_ties_keeps_the_best_scores():
+    scores = np.array([0.5, 0.9, 0.5, 0.9, 0.1, 0.5], dtype=np.float32)
+
+    top = top_k_scores(scores, 4)
+
+    assert [score for _, score in top] == pytest.approx([0.9, 0.9, 0.5, 0.5])
+    assert {i for i, _ in top[:2]} == {1, 3}
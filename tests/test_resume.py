@@ -0,0 +1,101 @@
+import fitz
+import pytest
+
+from app import utils
+from app.cache import make_cache
+from app.utils import PDFError, iter_pdf_pages, pdf_to_text
+
+
+def _pdf(*pages, title=""):
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    doc.set_metadata({"title": title})
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_pages_are_extracted_in_order():
+    pages = list(iter_pdf_pages(_pdf("page one", "page two")))
+
+    assert [page.strip() for page in pages] == ["page one", "page two"]
+
+
+def test_extraction_stops_at_the_page_budget():
+    pages = list(iter_pdf_pages(_pdf("a", "b", "c", "d"), max_pages=2))
+
+    assert [page.strip() for page in pages] == ["a", "b"]
+
+
+def test_extraction_truncates_at_the_character_budget():
+    text = "".join(iter_pdf_pages(_pdf("x" * 40, "y" * 40, "z" * 40), max_chars=60))
+
+    assert len(text) == 60
+    assert "z" not in text
+
+
+def test_pdf_to_text_reads_paths_and_file_objects(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(_pdf("Python developer"))
+
+    assert pdf_to_text(str(path)) == "Python developer"
+    with open(path, "rb") as f:
+        assert pdf_to_text(f) == "Python developer"
+
+
+def test_unreadable_or_empty_pdfs_raise_pdf_error(tmp_path):
+    with pytest.raises(PDFError):
+        pdf_to_text(b"not a pdf")
+    with pytest.raises(PDFError):
+        pdf_to_text(_pdf(""))
+    with pytest.raises(PDFError):
+        pdf_to_text(str(tmp_path / "missing.pdf"))
+
+
+@pytest.fixture
+def deepseek(monkeypatch):
+    """Counts _request_analysis calls behind a fresh, in-memory resume analysis cache."""
+    calls = []
+
+    def request_analysis(text):
+        calls.append(text)
+        return {"skills": "python", "projects": [], "experience": [], "experience_years": 1.0, "roles": []}
+
+    monkeypatch.setattr(utils, "resume_analysis_cache", make_cache("resume_analyses"))
+    monkeypatch.setattr(utils, "_request_analysis", request_analysis)
+    return calls
+
+
+def test_repeat_upload_skips_deepseek(deepseek):
+    pdf = _pdf("Python developer")
+
+    first = utils.process_resume_file(pdf)
+    second = utils.process_resume_file(pdf)
+
+    assert len(deepseek) == 1
+    assert first == second
+    assert second["processing_status"] == "success"
+    assert utils.resume_cache_stats()["hits"] == 1
+
+
+def test_same_text_in_a_different_file_skips_deepseek(deepseek):
+    first = _pdf("Python developer", title="v1")
+    second = _pdf("Python developer", title="v2")
+    assert first != second
+
+    utils.process_resume_file(first)
+    result = utils.process_resume_file(second)
+
+    assert len(deepseek) == 1
+    assert result["skills"] == "python"
+
+
+def test_failed_analyses_are_not_cached(deepseek, monkeypatch):
+    pdf = _pdf("Python developer")
+    monkeypatch.setattr(utils, "_request_analysis", lambda text: deepseek.append(text))
+
+    utils.process_resume_file(pdf)
+    utils.process_resume_file(pdf)
+
+    assert len(deepseek) == 2
@@ -0,0 +1,126 @@
+from datetime import datetime
+
+import pytest
+
+from app import tasks
+from app.models import db, BackgroundTask
+from app.tasks import TaskQueue, TASK_LEASE, WORKER_ID
+
+
+@pytest.fixture
+def queue(app, monkeypatch):
+    runs = []
+    monkeypatch.setitem(tasks._handlers, "test", lambda task, payload: runs.append(task.id))
+    queue = TaskQueue()
+    queue.init_app(app)
+    queue.runs = runs
+    yield queue
+    for executor in queue._executors.values():
+        executor.shutdown(wait=True)
+
+
+def _add_task(app, **fields):
+    with app.app_context():
+        task = BackgroundTask(user_id=1, kind="test", payload="{}", **fields)
+        db.session.add(task)
+        db.session.commit()
+        return task.id
+
+
+def _task(app, task_id):
+    with app.app_context():
+        task = db.session.get(BackgroundTask, task_id)
+        db.session.expunge(task)
+        return task
+
+
+def _drain(queue):
+    for executor in queue._executors.values():
+        executor.shutdown(wait=True)
+    queue._executors.clear()
+
+
+def test_pending_task_is_claimed_and_run_once(app, queue):
+    task_id = _add_task(app, status="pending")
+
+    queue._run(task_id)
+    queue._run(task_id)
+
+    assert queue.runs == [task_id]
+    task = _task(app, task_id)
+    assert task.status == "done"
+    assert task.owner == WORKER_ID
+    assert task.finished_at is not None
+
+
+def test_task_running_elsewhere_is_not_claimed(app, queue):
+    task_id = _add_task(app, status="running", owner="other", heartbeat_at=datetime.utcnow())
+
+    queue._run(task_id)
+
+    assert queue.runs == []
+    assert _task(app, task_id).owner == "other"
+
+
+def test_failed_handler_marks_the_task_failed(app, queue, monkeypatch):
+    def fail(task, payload):
+        raise RuntimeError("boom")
+    monkeypatch.setitem(tasks._handlers, "test", fail)
+    task_id = _add_task(app, status="pending")
+
+    queue._run(task_id)
+
+    task = _task(app, task_id)
+    assert task.status == "failed" and task.error == "boom"
+
+
+def test_requeue_takes_over_expired_leases_only(app, queue):
+    stale = datetime.utcnow() - TASK_LEASE * 2
+    expired = _add_task(app, status="running", owner="dead", started_at=stale, heartbeat_at=stale)
+    never_beat = _add_task(app, status="running", owner="dead", started_at=stale)
+    alive = _add_task(app, status="running", owner="other", started_at=stale, heartbeat_at=datetime.utcnow())
+    pending = _add_task(app, status="pending")
+    finished = _add_task(app, status="done")
+
+    queue._requeue_unfinished()
+    _drain(queue)
+
+    assert sorted(queue.runs) == sorted([expired, never_beat, pending])
+    for task_id in (expired, never_beat, pending):
+        assert _task(app, task_id).status == "done"
+        assert _task(app, task_id).owner == WORKER_ID
+    assert _task(app, alive).status == "running" and _task(app, alive).owner == "other"
+    assert _task(app, finished).status == "done" and finished not in queue.runs
+
+
+def test_task_is_queued_once_until_it_starts(app, queue):
+    task_id = _add_task(app, status="pending")
+
+    assert queue._enqueue(task_id, "test") is True
+    # the periodic requeue sees the same pending row while it waits
+    queue._requeue_unfinished()
+    _drain(queue)
+
+    assert queue.runs == [task_id]
+
+
+def test_heartbeat_refreshes_own_running_tasks(app, queue):
+    stale = datetime.utcnow() - TASK_LEASE * 2
+    mine = _add_task(app, status="running", owner=WORKER_ID, heartbeat_at=stale)
+    theirs = _add_task(app, status="running", owner="other", heartbeat_at=stale)
+
+    queue._heartbeat()
+
+    assert _task(app, mine).heartbeat_at > stale
+    assert _task(app, theirs).heartbeat_at == stale
+
+
+def test_start_runs_once(app, queue, monkeypatch):
+    calls = []
+    monkeypatch.setattr(queue, "_requeue_unfinished", lambda: calls.append(1))
+    monkeypatch.setattr(tasks, "TASK_HEARTBEAT_INTERVAL", 3600)
+
+    queue.start()
+    queue.start()
+
+    assert calls == [1]
@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from app.vector_index import JobIndex
+
+
+def _vectors(n, dim=16, seed=0, clusters=8):
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dim))
+    vectors = centres[rng.integers(0, clusters, n)] + 0.3 * rng.normal(size=(n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _jobs(n, start=0, city="London"):
+    return [
+        {"id": str(start + i), "location": {"display_name": city, "area": ["UK", city]}}
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def index(tmp_path):
+    return JobIndex(str(tmp_path / "job_index.db"))
+
+
+def test_flat_search_ranks_by_cosine_similarity(index):
+    vectors = _vectors(50)
+    index.add(_jobs(50), vectors, [f"h{i}" for i in range(50)], "GB")
+
+    hits = index.search(vectors[7], k=5)
+
+    assert hits[0][0] == "7" and hits[0][1] == pytest.approx(1.0, abs=1e-2)
+    assert [score for _, score in hits] == sorted((score for _, score in hits), reverse=True)
+    expected = np.argsort(-(vectors @ vectors[7]))[:5]
+    assert [job_id for job_id, _ in hits] == [str(i) for i in expected]
+
+
+def test_readding_unchanged_jobs_is_skipped(index):
+    vectors = _vectors(10)
+    hashes = [f"h{i}" for i in range(10)]
+
+    assert index.add(_jobs(10), vectors, hashes, "GB") == 10
+    assert index.add(_jobs(10), vectors, hashes, "GB") == 0
+    assert index.add(_jobs(10), vectors, hashes[:9] + ["edited"], "GB") == 1
+    index.refresh()
+    assert len(index) == 10
+
+
+def test_search_filters_by_country_city_and_remote(index):
+    vectors = _vectors(30)
+    index.add(_jobs(10, 0, "London"), vectors[:10], ["h"] * 10, "GB")
+    index.add(_jobs(10, 10, "Leeds"), vectors[10:20], ["h"] * 10, "GB")
+    index.add(_jobs(10, 20, "Berlin"), vectors[20:], ["h"] * 10, "DE", remote=True)
+
+    def ids(**filters):
+        return {int(job_id) for job_id, _ in index.search(vectors[0], k=30, **filters)}
+
+    assert ids(country="gb") == set(range(20))
+    assert ids(country="GB", city="leeds") == set(range(10, 20))
+    assert ids(remote=True) == set(range(20, 30))
+    assert ids(country="fr") == set()
+
+
+def test_rows_added_by_another_process_are_picked_up(index):
+    vectors = _vectors(20)
+    index.add(_jobs(10), vectors[:10], ["h"] * 10, "GB")
+    assert len(index.search(vectors[0], k=50)) == 10
+
+    JobIndex(index.path).add(_jobs(10, 10), vectors[10:], ["h"] * 10, "GB")
+
+    assert len(index.search(vectors[0], k=50)) == 20
+
+
+def test_ivf_recall_against_flat_search(index):
+    vectors = _vectors(3000, seed=1)
+    index.add(_jobs(3000), vectors, ["h"] * 3000, "GB")
+    queries = _vectors(20, seed=2)
+
+    assert index.search(queries[0], k=10, mode="ivf") == index.search(queries[0], k=10)  # untrained: flat
+    index.build_ivf(nlist=32)
+
+    recall = []
+    for query in queries:
+        exact = {job_id for job_id, _ in index.search(query, k=10)}
+        approx = {job_id for job_id, _ in index.search(query, k=10, mode="ivf", nprobe=8)}
+        recall.append(len(exact & approx) / 10)
+    assert np.mean(recall) >= 0.9
+
+
+def test_centroids_are_retrained_as_the_corpus_grows(index):
+    vectors = _vectors(400)
+    index.add(_jobs(100), vectors[:100], ["h"] * 100, "GB")
+
+    assert not index.ivf_due(min_rows=200)
+    assert not index.maybe_build_ivf(min_rows=200)
+
+    index.add(_jobs(100, 100), vectors[100:200], ["h"] * 100, "GB")
+    assert index.ivf_due(min_rows=200)
+    assert index.maybe_build_ivf(min_rows=200)
+    assert not index.ivf_due(min_rows=200)
+
+    index.add(_jobs(200, 200), vectors[200:], ["h"] * 200, "GB")
+    assert index.ivf_due(min_rows=200, growth=2.0)
+
+    # a worker that loads the saved centroids counts them as trained on its corpus
+    other = JobIndex(index.path)
+    other.search(vectors[0], k=1)
+    assert not other.ivf_due(min_rows=200)
+
+
+def test_index_jobs_reuses_the_ranking_vectors(index, tmp_path, monkeypatch):
+    from app import pipeline, utils
+    from app.job_store import JobStore
+
+    def no_embedding(*args):
+        raise AssertionError("jobs were embedded again")
+    monkeypatch.setattr(utils, "embed_job_texts", no_embedding)
+    monkeypatch.setattr(pipeline, "embed_job_texts", no_embedding)
+    monkeypatch.setattr(pipeline, "job_index", index)
+    monkeypatch.setattr(pipeline, "job_store", JobStore(str(tmp_path / "jobs.db")))
+    jobs, vectors = _jobs(5), _vectors(5)
+
+    pipeline.index_jobs(jobs, [f"text {i}" for i in range(5)], vectors, "GB", False)
+
+    assert index.search(vectors[3], k=1)[0][0] == "3"
+    assert set(pipeline.job_store.get_many(["0", "4"])) == {"0", "4"}